@@ -0,0 +1,378 @@
+# Benchmark a whole podscriber run offline, from feed to git push
+#
+# Everything podscriber talks to is replaced by a local stand-in:
+#   feed and audio host  a local HTTP server with a synthetic feed of --episodes items, each with a generated WAV file
+#   git remote           a bare repository in the work directory, cloned as REPO_ROOT
+#   whisper              a stub executable that sleeps --whisper-speed seconds per second of audio
+#   ffmpeg, ffprobe      the real ones when installed, otherwise stubs that copy and measure the (already 16 kHz) WAV file
+#   embeddings           ChromaDB's default model, or with --embedder hash a deterministic offline stand-in
+# A config module pointing at the stand-ins is generated before podscriber is imported. The script then runs
+# process_feed, generate_chroma_hashes and commit_database_and_files and reports episodes per second,
+# peak RSS and the latency of every stage recorded by podscriber's spans.
+#
+# Usage (from the repository root):
+#   python bench/pipeline_throughput.py --episodes 50
+#   python bench/pipeline_throughput.py --episodes 200 --whisper-workers 2 --embedder hash --output bench/results.jsonl
+
+import argparse
+import contextlib
+import hashlib
+import http.server
+import io
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from email.utils import formatdate
+from xml.sax.saxutils import escape
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 16000  # Generated audio is already in the format convert_to_wav produces
+EMBEDDING_DIMENSIONS = 384  # Size of the vectors made by ChromaDB's default embedding model
+
+STUB_WHISPER = '''#!{python}
+# Stand-in for the whisper.cpp CLI: waits in proportion to the audio length and writes a transcript
+import os, random, sys, time
+args = sys.argv[1:]
+source = args[args.index("-f") + 1]
+output = args[args.index("--output-file") + 1]
+data = sys.stdin.buffer.read() if source == "-" else open(source, "rb").read()
+seconds = max(len(data) - 44, 0) / {bytes_per_second}
+time.sleep(seconds * {speed})
+rng = random.Random(len(data))
+words = ["podcast", "episode", "market", "science", "history", "music", "story", "interview", "city", "future"]
+with open(output + ".txt", "w") as f:
+    f.write(" ".join(rng.choice(words) for _ in range(int(seconds * 2.5))))
+'''
+
+STUB_FFMPEG = '''#!{python}
+# Stand-in for ffmpeg: the generated audio already is 16 kHz mono WAV, so converting it is a copy
+import shutil, sys
+args = sys.argv[1:]
+source = args[args.index("-i") + 1]
+with open(source, "rb") as f:
+    if args[-1] == "-":
+        shutil.copyfileobj(f, sys.stdout.buffer)
+    else:
+        with open(args[-1], "wb") as out:
+            shutil.copyfileobj(f, out)
+'''
+
+STUB_FFPROBE = '''#!{python}
+# Stand-in for ffprobe: the length of the generated WAV file follows from its size
+import os, sys
+print((os.path.getsize(sys.argv[-1]) - 44) / {bytes_per_second})
+'''
+
+# Generate a WAV file of a quiet tone
+def make_audio(seconds):
+    """Return the bytes of a 16 kHz mono 16-bit WAV file of the given length."""
+    frames = int(seconds * SAMPLE_RATE)
+    tone = [int(3000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(SAMPLE_RATE)]
+    pcm = struct.pack(f"<{SAMPLE_RATE}h", *tone) * (frames // SAMPLE_RATE + 1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm[:frames * 2])
+    return buffer.getvalue()
+
+# Build an RSS feed shaped like the Overcast activity feed, newest item first
+def make_feed(base_url, episodes):
+    """Return the XML of a feed with one item per episode."""
+    items = []
+    for i in reversed(range(episodes)):
+        items.append(f"""<item>
+<title>{escape(f"Podcast {i % 10}: Episode {i}")}</title>
+<pubDate>{formatdate(1700000000 + i * 3600)}</pubDate>
+<guid>{base_url}/episodes/{i}</guid>
+<link>{base_url}/podcasts/{i % 10}</link>
+<enclosure url="{base_url}/audio/{i}.mp3" type="audio/mpeg"/>
+</item>""")
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Bench</title>{"".join(items)}</channel></rss>'.encode()
+
+# Serve the feed and the audio files from a background thread
+def start_http_server(episodes, audio):
+    """Start the local feed and audio host and return (server, base_url)."""
+    state = {}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/feed.xml":
+                body, content_type = state["feed"], "application/rss+xml"
+            elif self.path.startswith("/audio/"):
+                body, content_type = audio, "audio/mpeg"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    state["feed"] = make_feed(base_url, episodes)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, base_url
+
+# Write an executable Python script
+def write_stub(path, source):
+    """Write source to path and make it executable."""
+    with open(path, "w") as f:
+        f.write(source)
+    os.chmod(path, 0o755)
+
+# Create the bare remote and clone it where podscriber expects its repository
+def make_git_remote(work_dir):
+    """Return the path of a clone of a fresh bare repository with one commit on main."""
+    remote = os.path.join(work_dir, "remote.git")
+    repo_root = os.path.join(work_dir, "repo")
+    subprocess.run(["git", "init", "-q", "--bare", remote], check=True)
+    subprocess.run(["git", "clone", "-q", remote, repo_root], check=True, capture_output=True)
+    for key, value in (("user.name", "bench"), ("user.email", "bench@example.com")):
+        subprocess.run(["git", "config", key, value], cwd=repo_root, check=True)
+    with open(os.path.join(repo_root, "README.md"), "w") as f:
+        f.write("# bench\n")
+    subprocess.run(["git", "add", "README.md"], cwd=repo_root, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "Initial commit"], cwd=repo_root, check=True)
+    subprocess.run(["git", "branch", "-M", "main"], cwd=repo_root, check=True)
+    subprocess.run(["git", "push", "-q", "-u", "origin", "main"], cwd=repo_root, check=True, capture_output=True)
+    return repo_root
+
+# Generate the config module podscriber imports, starting from the repository's own config.py
+def write_config(config_dir, work_dir, repo_root, base_url, whisper, args):
+    """Write config.py with every path and service pointing at the local stand-ins."""
+    with open(os.path.join(REPO_DIR, "config.py")) as f:
+        config = f.read()
+    overrides = {
+        "RSS_FEED_URL": f"{base_url}/feed.xml",
+        "REPO_ROOT": repo_root,
+        "PODCAST_AUDIO_FOLDER": os.path.join(work_dir, "audio"),
+        "PODCAST_HISTORY_FILE": os.path.join(repo_root, "podcast_history.html"),
+        "TRANSCRIBED_FOLDER": os.path.join(repo_root, "transcribed"),
+        "PODSCRIBER_STATE_DIR": os.path.join(work_dir, "state"),
+        "CHROMADB_DB_PATH": os.path.join(repo_root, "chroma_db"),
+        "WHISPER_EXECUTABLE": whisper,
+        "WHISPER_MODEL_PATH": os.path.join(work_dir, "model.bin"),
+        "WHISPER_STREAM_AUDIO": args.stream_audio,
+        "WHISPER_CHUNKED": False,
+        "WHISPER_SERVER_ENABLED": False,
+        "TRANSCRIPT_CACHE_DIR": None,
+        "DEBUG_MODE_LIMIT": None,
+        "DOWNLOAD_WORKERS": args.download_workers,
+        "TRANSCODE_WORKERS": args.transcode_workers,
+        "WHISPER_WORKERS": args.whisper_workers,
+        "PIPELINE_QUEUE_SIZE": args.queue_size,
+        "GITHUB_USERNAME": "bench",
+        "STATIC_ARCHIVE_ENABLED": False,
+        "SYNC_MODE": "database",
+        "METRICS_TEXTFILE": None,
+        "PUBLIC_SSH_KEY": os.path.join(work_dir, "id.pub"),
+        "PRIVATE_SSH_KEY": os.path.join(work_dir, "id"),
+        "USE_GITHUB_DEPLOY_KEY": False,
+        "GITHUB_PRO_ACCOUNT": False,
+    }
+    config += "\n# Benchmark overrides\n" + "".join(f"{key} = {value!r}\n" for key, value in overrides.items())
+    with open(os.path.join(config_dir, "config.py"), "w") as f:
+        f.write(config)
+
+# Offline stand-in for the embedding model, so the benchmark runs without downloading it
+def make_hash_embedding_function():
+    """Return a ChromaDB embedding function that hashes words into fixed vectors."""
+    from chromadb import EmbeddingFunction
+
+    class HashEmbeddingFunction(EmbeddingFunction):
+        def __init__(self):
+            pass
+
+        def __call__(self, input):
+            vectors = []
+            for text in input:
+                vector = [0.0] * EMBEDDING_DIMENSIONS
+                for word in text.lower().split():
+                    vector[int.from_bytes(hashlib.blake2b(word.encode(), digest_size=4).digest(), "little") % EMBEDDING_DIMENSIONS] += 1.0
+                vectors.append(vector)
+            return vectors
+
+        @staticmethod
+        def name():
+            return "podscriber_bench_hash"
+
+        def get_config(self):
+            return {}
+
+        @staticmethod
+        def build_from_config(config):
+            return HashEmbeddingFunction()
+
+    return HashEmbeddingFunction()
+
+# Peak resident set size of this process and of its finished children, in MiB
+def peak_rss_mib():
+    """Return (self, children) peak RSS in MiB."""
+    # Children started with os.system or subprocess are forks of this process, so their peak includes it
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS, KiB on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+# Latency percentiles of every stage recorded by podscriber's spans
+def stage_latencies(spans):
+    """Return {stage: {count, p50, p95, max, total}} in seconds."""
+    by_stage = {}
+    for record in spans:
+        by_stage.setdefault(record["stage"], []).append(record["seconds"])
+    latencies = {}
+    for stage, seconds in by_stage.items():
+        seconds.sort()
+        latencies[stage] = {
+            "count": len(seconds),
+            "p50": seconds[len(seconds) // 2],
+            "p95": seconds[min(int(len(seconds) * 0.95), len(seconds) - 1)],
+            "max": seconds[-1],
+            "total": round(sum(seconds), 3),
+        }
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure podscriber throughput against local stand-ins.")
+    parser.add_argument("--episodes", type=int, default=20, help="Items in the synthetic feed")
+    parser.add_argument("--audio-seconds", type=float, default=30, help="Length of each generated audio file")
+    parser.add_argument("--whisper-speed", type=float, default=0.02, help="Seconds the stub whisper takes per second of audio")
+    parser.add_argument("--download-workers", type=int, default=4, help="DOWNLOAD_WORKERS for the run")
+    parser.add_argument("--transcode-workers", type=int, default=2, help="TRANSCODE_WORKERS for the run")
+    parser.add_argument("--whisper-workers", type=int, default=1, help="WHISPER_WORKERS for the run")
+    parser.add_argument("--queue-size", type=int, default=4, help="PIPELINE_QUEUE_SIZE for the run")
+    parser.add_argument("--stream-audio", action="store_true", help="Pipe audio from ffmpeg into whisper instead of writing WAV files")
+    parser.add_argument("--embedder", choices=["default", "hash"], default="default",
+                        help="ChromaDB's default embedding model, or an offline hashing stand-in")
+    parser.add_argument("--output", help="Append the results as one JSON line to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory and print its path")
+    parser.add_argument("--verbose", action="store_true", help="Show podscriber's own output")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="podscriber-pipeline-bench-")
+    server = None
+    try:
+        audio = make_audio(args.audio_seconds)
+        server, base_url = start_http_server(args.episodes, audio)
+        repo_root = make_git_remote(work_dir)
+
+        bin_dir = os.path.join(work_dir, "bin")
+        os.makedirs(bin_dir)
+        whisper = os.path.join(bin_dir, "whisper")
+        write_stub(whisper, STUB_WHISPER.format(python=sys.executable, bytes_per_second=SAMPLE_RATE * 2, speed=args.whisper_speed))
+        if not shutil.which("ffmpeg"):
+            write_stub(os.path.join(bin_dir, "ffmpeg"), STUB_FFMPEG.format(python=sys.executable))
+        if not shutil.which("ffprobe"):
+            write_stub(os.path.join(bin_dir, "ffprobe"), STUB_FFPROBE.format(python=sys.executable, bytes_per_second=SAMPLE_RATE * 2))
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+        with open(os.path.join(work_dir, "model.bin"), "wb") as f:
+            f.write(b"bench model")
+
+        # podscriber reads its configuration at import time, so the generated config has to come first on the path
+        config_dir = os.path.join(work_dir, "config")
+        os.makedirs(config_dir)
+        write_config(config_dir, work_dir, repo_root, base_url, whisper, args)
+        sys.path[:0] = [config_dir, REPO_DIR]
+        import podscriber
+
+        log = sys.stdout if args.verbose else open(os.path.join(work_dir, "podscriber.log"), "w")
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            # The same git work as a scheduled run, so the subprocess count matches what a run starts
+            with podscriber.span("git_setup"):
+                podscriber.initialize_local_git_repo(repo_root)
+                podscriber.ensure_initial_commit(repo_root)
+            with podscriber.span("chromadb_init"):
+                if args.embedder == "hash":
+                    import chromadb
+                    embedding_function = make_hash_embedding_function()
+                    podscriber.client = chromadb.PersistentClient(path=podscriber.CHROMADB_DB_PATH)
+                    podscriber.podcast_collection = podscriber.client.get_or_create_collection(
+                        name="podcasts", embedding_function=embedding_function)
+                    podscriber.passage_collection = podscriber.client.get_or_create_collection(
+                        name=podscriber.PASSAGE_COLLECTION_NAME, embedding_function=embedding_function)
+                else:
+                    podscriber.init_chromadb()
+
+            hash_file = os.path.join(repo_root, "chroma_hashes.txt")
+            with podscriber.span("hash") as record:
+                record["bytes"] = podscriber.generate_chroma_hashes(podscriber.CHROMADB_DB_PATH, repo_root, hash_file)
+            with podscriber.span("sync_pull"):
+                podscriber.pull_and_sync_chromadb_if_necessary(podscriber.GITHUB_REPO_NAME, podscriber.CHROMADB_DB_PATH, hash_file,
+                                                               os.path.relpath(podscriber.CHROMADB_DB_PATH, repo_root))
+
+            with podscriber.span("process_feed"):
+                new_files = podscriber.process_feed(podscriber.RSS_FEED_URL, podscriber.PODCAST_AUDIO_FOLDER,
+                                                    podscriber.PODCAST_HISTORY_FILE, debug=False)
+            processed_at = time.perf_counter()
+
+            with podscriber.span("hash") as record:
+                record["bytes"] = podscriber.generate_chroma_hashes(podscriber.CHROMADB_DB_PATH, repo_root, hash_file)
+            with podscriber.span("git_commit"):
+                pushed = podscriber.commit_database_and_files(repo_root, podscriber.CHROMADB_DB_PATH,
+                                                              podscriber.PODCAST_HISTORY_FILE, new_files)
+            with podscriber.span("git_reset"):
+                podscriber.reset_to_remote(repo_root)
+        finished = time.perf_counter()
+
+        indexed = sum(record["stage"] == "episode" for record in podscriber.run_spans)
+        self_rss, children_rss = peak_rss_mib()
+        results = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "args": vars(args),
+            "episodes_indexed": indexed,
+            "episodes_failed": len(podscriber.failed_episodes),
+            "pushed": pushed,
+            "process_feed_seconds": round(processed_at - started, 3),
+            "total_seconds": round(finished - started, 3),
+            "episodes_per_second": round(indexed / (processed_at - started), 3) if indexed else 0.0,
+            "peak_rss_mib": round(self_rss, 1),
+            "peak_child_rss_mib": round(children_rss, 1),
+            "git_subprocesses": podscriber.git_subprocess_count,
+            "whisper_realtime_factor": podscriber.summarize_spans(podscriber.run_spans).get("whisper", {}).get("realtime_factor"),
+            "stages": stage_latencies(podscriber.run_spans),
+        }
+
+        print(f"{indexed} of {args.episodes} episodes indexed, {results['episodes_failed']} failed, pushed: {pushed}")
+        print(f"process_feed {results['process_feed_seconds']:.2f} s   {results['episodes_per_second']:.2f} episodes/s   "
+              f"total {results['total_seconds']:.2f} s")
+        print(f"peak RSS {self_rss:.0f} MiB (largest child {children_rss:.0f} MiB), {podscriber.git_subprocess_count} git subprocesses, "
+              f"whisper realtime factor {results['whisper_realtime_factor']}")
+        print(f"\n{'stage':<16} {'count':>5} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'total s':>9}")
+        for stage, latency in sorted(results["stages"].items(), key=lambda item: -item[1]["total"]):
+            print(f"{stage:<16} {latency['count']:>5} {latency['p50']:>8.3f} {latency['p95']:>8.3f} "
+                  f"{latency['max']:>8.3f} {latency['total']:>9.3f}")
+
+        if args.output:
+            with open(args.output, "a") as f:
+                f.write(json.dumps(results) + "\n")
+            print(f"\nResults appended to {args.output}")
+    finally:
+        if server:
+            server.shutdown()
+        if args.keep:
+            print(f"Work directory kept at {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
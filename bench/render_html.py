@@ -0,0 +1,123 @@
+# Benchmark rendering the history file with the shared Jinja2 templates
+#
+# Renders the same synthetic episodes three ways and prints the time taken by each:
+#   legacy-append  the former path: header written, one append-mode open per row, footer appended
+#   legacy-concat  the same f-string rows joined into one string and written once
+#   jinja          history.html streamed with generate() into the file (what podscriber does now)
+# It also times loading the template with and without the bytecode cache.
+#
+# Usage (from the repository root, with config.py in place):
+#   python bench/render_html.py --rows 10000
+
+import argparse
+import html
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
+import podscriber
+from podscriber import (
+    build_podcast_entry, write_template_atomically, HISTORY_ROWS_END_MARKER, TEMPLATES_DIR,
+    iso_listen_date, short_listen_date
+)
+
+# Episode metadata shaped like the ChromaDB metadata podscriber stores
+def make_metadatas(rows):
+    """Return a list of (guid, metadata) pairs."""
+    return [(f"https://example.com/episodes/{i}", {
+        "podcast_name": f"Podcast {i % 40}",
+        "episode_title": f"Episode {i}: A <longer> title & more",
+        "listenDate": f"Mon, {1 + i % 28:02d} Jan {2015 + i % 10} 10:00:00 +0000",
+        "mp3_url": f"https://example.com/audio/{i}.mp3",
+        "link": f"https://example.com/podcasts/{i % 40}",
+    }) for i in range(rows)]
+
+# The row markup of the former f-string path
+def legacy_row(metadata, guid):
+    """Return one row the way save_downloaded_url used to build it."""
+    transcript_url = f"https://raw.githubusercontent.com/user/repo/main/transcribed/{podscriber.normalize_folder_name(metadata['podcast_name'])}/{podscriber.normalize_folder_name(metadata['episode_title'])}.txt"
+    return f"""
+<tr class="hover:bg-gray-100">
+    <td class="py-4 px-6 border-b text-lg"><a href="{html.escape(metadata['link'])}" target="_blank" class="text-blue-600 hover:underline">{html.escape(metadata['podcast_name'])}</a></td>
+    <td class="py-4 px-6 border-b text-lg"><a href="{html.escape(guid)}" target="_blank" class="text-blue-600 hover:underline">{html.escape(metadata['episode_title'])}</a></td>
+    <td class="py-4 px-6 border-b text-lg">{html.escape(podscriber.format_date_short(metadata['listenDate']))}</td>
+    <td class="py-4 px-6 border-b text-lg"><a href="{transcript_url}" target="_blank" class="text-blue-500 text-lg">&#x1F4C4;</a></td>
+    <td class="py-4 px-6 border-b text-lg"><audio src="{metadata['mp3_url']}" controls class="w-8 h-8"></audio></td>
+</tr>
+    """
+
+LEGACY_HEADER = "<!DOCTYPE html><html><body><table id=\"podcastTable\"><tbody>\n"
+LEGACY_FOOTER = "\n</tbody></table></body></html>\n"
+
+def legacy_append(path, metadatas):
+    with open(path, "w") as f:
+        f.write(LEGACY_HEADER)
+    for guid, metadata in metadatas:
+        with open(path, "a") as f:
+            f.write(legacy_row(metadata, guid))
+    with open(path, "a") as f:
+        f.write(LEGACY_FOOTER)
+
+def legacy_concat(path, metadatas):
+    with open(path, "w") as f:
+        f.write(LEGACY_HEADER + "".join(legacy_row(metadata, guid) for guid, metadata in metadatas) + LEGACY_FOOTER)
+
+def jinja_render(path, metadatas):
+    entries = [build_podcast_entry(guid, metadata) for guid, metadata in metadatas]
+    write_template_atomically(path, "history.html", {"entries": entries, "rows_end_marker": HISTORY_ROWS_END_MARKER})
+
+# Time the best of several runs
+def best_of(repeats, run):
+    """Return the fastest of repeats runs in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+# Time compiling history.html in a fresh environment, with or without a bytecode cache directory
+def template_load_time(cache_dir):
+    """Return the milliseconds taken to load history.html and the templates it uses."""
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+        autoescape=select_autoescape(["html"])
+    )
+    environment.filters["iso_date"] = iso_listen_date
+    environment.filters["short_date"] = short_listen_date
+    start = time.perf_counter()
+    for name in ("history.html", "history_rows.html", "_macros.html", "base.html"):
+        environment.get_template(name)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare history file rendering paths.")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of episodes rendered")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per path; the fastest is reported")
+    args = parser.parse_args()
+
+    metadatas = make_metadatas(args.rows)
+    work_dir = tempfile.mkdtemp(prefix="podscriber-render-bench-")
+    try:
+        output = os.path.join(work_dir, "history.html")
+        print(f"{args.rows} rows, best of {args.repeats}")
+        for label, run in (("legacy-append", legacy_append), ("legacy-concat", legacy_concat), ("jinja", jinja_render)):
+            milliseconds = best_of(args.repeats, lambda: run(output, metadatas))
+            print(f"{label:<14} {milliseconds:8.1f} ms   {os.path.getsize(output) / 1024:8.0f} KiB")
+
+        cache_dir = os.path.join(work_dir, "bytecode")
+        os.makedirs(cache_dir)
+        print(f"\ntemplate load, no cache      {template_load_time(None):6.1f} ms")
+        template_load_time(cache_dir)
+        print(f"template load, bytecode cache {template_load_time(cache_dir):6.1f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
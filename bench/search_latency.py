@@ -0,0 +1,157 @@
+# Benchmark the /search code path on a synthetic archive
+#
+# Builds a throwaway archive of generated transcripts, indexes it for keyword search and in an
+# in-memory ChromaDB collection, then times keyword, vector and fused searches.
+#
+# Usage (from the repository root, with config.py in place):
+#   python bench/search_latency.py --episodes 10000
+#   python bench/search_latency.py --episodes 10000 --real-embedder   # also time the embedding model
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+from podscriber import (
+    open_search_index, update_search_index, keyword_search, search_transcripts,
+    get_transcript_guids, get_query_embedder
+)
+
+EMBEDDING_DIMENSIONS = 384  # Size of the vectors made by ChromaDB's default embedding model
+VOCABULARY_SIZE = 20000  # Distinct words in the generated transcripts
+
+# Generate a vocabulary of pronounceable made-up words
+def make_vocabulary(rng):
+    """Return VOCABULARY_SIZE distinct words."""
+    syllables = ["ka", "lo", "mi", "ra", "tu", "ne", "so", "vi", "da", "pe", "zu", "ho", "ri", "fa", "ge", "by"]
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+# Write the synthetic transcripts in the same layout as TRANSCRIBED_FOLDER
+def write_transcripts(folder, episodes, words_per_episode, vocabulary, rng):
+    """Return a list of (guid, podcast_name, episode_title, text) for the generated episodes."""
+    # Zipf-like word frequencies so some words are common and most are rare, as in speech
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    generated = []
+    for i in range(episodes):
+        podcast_name = f"Podcast {i % 50}"
+        episode_title = f"Episode {i}"
+        text = " ".join(rng.choices(vocabulary, weights=weights, k=words_per_episode))
+        podcast_folder = os.path.join(folder, podcast_name.replace(" ", "_"))
+        os.makedirs(podcast_folder, exist_ok=True)
+        with open(os.path.join(podcast_folder, f"{episode_title.replace(' ', '_')}.txt"), "w") as f:
+            f.write(f"{podcast_name}: {episode_title}\nhttps://example.com/{i}\n\n{text}")
+        generated.append((f"guid-{i}", podcast_name, episode_title, text))
+    return generated
+
+# Fill in-memory collections shaped like the podcasts and passages collections
+def build_collections(generated, passages_per_episode, rng):
+    """Return (podcast_collection, passage_collection) filled with random embeddings."""
+    client = chromadb.EphemeralClient()
+    podcast_collection = client.create_collection(name="bench_podcasts", embedding_function=None)
+    passage_collection = client.create_collection(name="bench_passages", embedding_function=None)
+
+    def random_vector():
+        return [rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSIONS)]
+
+    batch_size = 1000
+    for start in range(0, len(generated), batch_size):
+        batch = generated[start:start + batch_size]
+        podcast_collection.add(
+            ids=[guid for guid, _, _, _ in batch],
+            embeddings=[random_vector() for _ in batch],
+            documents=[f"{name} - {title}" for _, name, title, _ in batch],
+            metadatas=[{"podcast_name": name, "episode_title": title, "listenDate": "01/01/2024"}
+                       for _, name, title, _ in batch]
+        )
+        passage_ids, passage_vectors, passage_documents, passage_metadatas = [], [], [], []
+        for guid, name, title, text in batch:
+            step = max(len(text) // passages_per_episode, 1)
+            for p in range(passages_per_episode):
+                passage_ids.append(f"{guid}#{p}")
+                passage_vectors.append(random_vector())
+                passage_documents.append(text[p * step:p * step + 1000])
+                passage_metadatas.append({"guid": guid, "podcast_name": name, "episode_title": title, "passage_index": p})
+        passage_collection.add(ids=passage_ids, embeddings=passage_vectors,
+                               documents=passage_documents, metadatas=passage_metadatas)
+    return podcast_collection, passage_collection
+
+# Time a function over every query
+def time_queries(label, queries, run):
+    """Print and return the p50, p95 and max latency in milliseconds."""
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        run(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+    print(f"{label:<10} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   max {latencies[-1]:7.1f} ms")
+    return p50, p95, latencies[-1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search latency on a synthetic archive.")
+    parser.add_argument("--episodes", type=int, default=10000, help="Number of generated episodes")
+    parser.add_argument("--words-per-episode", type=int, default=1500, help="Words in each generated transcript")
+    parser.add_argument("--passages-per-episode", type=int, default=5, help="Passages stored per episode")
+    parser.add_argument("--queries", type=int, default=200, help="Number of timed queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--real-embedder", action="store_true",
+                        help="Embed queries with ChromaDB's default model instead of random vectors")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix="podscriber-search-bench-")
+    try:
+        transcribed_folder = os.path.join(work_dir, "transcribed")
+        vocabulary = make_vocabulary(rng)
+
+        start = time.perf_counter()
+        generated = write_transcripts(transcribed_folder, args.episodes, args.words_per_episode, vocabulary, rng)
+        print(f"Generated {args.episodes} transcripts in {time.perf_counter() - start:.1f} s")
+
+        search_conn = open_search_index(os.path.join(work_dir, "search_index.db"))
+        start = time.perf_counter()
+        update_search_index(search_conn, transcribed_folder)
+        print(f"Built keyword index in {time.perf_counter() - start:.1f} s")
+
+        start = time.perf_counter()
+        podcast_collection, passage_collection = build_collections(generated, args.passages_per_episode, rng)
+        print(f"Built vector collections in {time.perf_counter() - start:.1f} s")
+
+        transcript_guids = get_transcript_guids(podcast_collection)
+        if args.real_embedder:
+            embed = get_query_embedder()
+            embed(["warm up"])
+        else:
+            def embed(texts):
+                return [[rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSIONS)] for _ in texts]
+
+        # Queries of one to four words, mixing common and rare words
+        queries = [" ".join(rng.choice(vocabulary[:rng.choice([100, 2000, VOCABULARY_SIZE])])
+                            for _ in range(rng.randint(1, 4))) for _ in range(args.queries)]
+
+        print(f"\n{args.queries} queries, k={args.k}")
+        time_queries("keyword", queries, lambda q: keyword_search(search_conn, q, args.k * 2))
+        time_queries("embed", queries, lambda q: embed([q]))
+        time_queries("vector", queries, lambda q: passage_collection.query(
+            query_embeddings=embed([q]), n_results=args.k * 3, include=["documents", "metadatas"]))
+        _, p95, _ = time_queries("hybrid", queries, lambda q: search_transcripts(
+            q, podcast_collection, passage_collection, search_conn, transcript_guids, embed, k=args.k))
+        print(f"\nHybrid p95 {'meets' if p95 < 100 else 'misses'} the 100 ms target.")
+        search_conn.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
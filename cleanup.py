@@ -3,7 +3,7 @@ import shutil
 import requests
 import sys
 import re
-from config import REPO_ROOT, PODCAST_AUDIO_FOLDER, PODCAST_HISTORY_FILE, TRANSCRIBED_FOLDER, CHROMADB_DB_PATH, GITHUB_USERNAME, GITHUB_TOKEN, GITHUB_REPO_NAME
+from config import REPO_ROOT, PODCAST_AUDIO_FOLDER, PODCAST_HISTORY_FILE, TRANSCRIBED_FOLDER, CHROMADB_DB_PATH, GITHUB_USERNAME, GITHUB_TOKEN, GITHUB_REPO_NAME, PODSCRIBER_STATE_DIR
 
 # Function to display help message
 def show_help():
@@ -94,6 +94,21 @@ def delete_local_repo():
     except Exception as e:
         print(f"Failed to delete local repository: {e}")
 
+# Function to forget the state kept about the database that is being deleted
+def delete_database_state():
+    """
+    Delete the feed cache, the job table and the passage backfill list from PODSCRIBER_STATE_DIR.
+    Without this, the next run could find the feed unchanged and skip rebuilding the database.
+    """
+    delete_file(os.path.join(PODSCRIBER_STATE_DIR, "feed_state.json"))
+    passage_backfill_file = os.path.join(PODSCRIBER_STATE_DIR, "passage_backfill.json")
+    if os.path.exists(passage_backfill_file):
+        delete_file(passage_backfill_file)
+    for suffix in ("", "-wal", "-shm"):
+        path = os.path.join(PODSCRIBER_STATE_DIR, "jobs.db" + suffix)
+        if os.path.exists(path):
+            delete_file(path)
+
 # Function to delete the remote GitHub repo
 def delete_remote_repo():
     """
@@ -251,17 +266,21 @@ REPO_ROOT = os.path.expanduser(REPO_ROOT)
 PODCAST_AUDIO_FOLDER = os.path.expanduser(PODCAST_AUDIO_FOLDER)
 TRANSCRIBED_FOLDER = os.path.expanduser(TRANSCRIBED_FOLDER)
 PODCAST_HISTORY_FILE = os.path.expanduser(PODCAST_HISTORY_FILE)
+CHROMADB_DB_PATH = os.path.expanduser(CHROMADB_DB_PATH)
+PODSCRIBER_STATE_DIR = os.path.expanduser(PODSCRIBER_STATE_DIR)
 CHROMA_HASH_FILE = os.path.join(REPO_ROOT, "chroma_hashes.txt")
 
 # Check flags and perform actions
 if RESET:
     # If reset flag is set, delete both local and remote repositories and reset deploy keys
     delete_local_repo()
+    delete_database_state()
     delete_remote_repo()
     reset_deploy_keys()
 elif RESET_LOCAL_ONLY:
     # If reset-local-only flag is set, only delete the local repository
     delete_local_repo()
+    delete_database_state()
 elif RESET_DEPLOY_KEYS:
     # If reset-deploy-keys flag is set, only reset the deploy keys
     reset_deploy_keys()
@@ -271,6 +290,7 @@ else:
         delete_folder(os.path.join(REPO_ROOT, ".git"))
     if DELETE_CHROMADB:
         delete_folder(CHROMADB_DB_PATH)
+        delete_database_state()
     if DELETE_CHROMAHASH:
         delete_file(CHROMA_HASH_FILE)
     if DELETE_HISTORY:
@@ -1,14 +1,30 @@
 # Configuration for Podcast Downloader and Transcriber
 RSS_FEED_URL = "https://example.com/rss_feed.xml" # RSS Feed URL from which to download podcast episodes
+FEED_KNOWN_GUID_RUN = 5 # Stop reading the feed after this many already processed episodes in a row (newest items come first); set to None to always read the whole feed
+FEED_CHUNK_SIZE = 65536 # Number of bytes read from the feed at a time while it is parsed
 REPO_ROOT = "~/podscriber/"  # Update this to the root of your Git repository
 
 # Folder paths to store downloaded podcast files and transcriptions
 PODCAST_AUDIO_FOLDER = "~/podscriber/podcast_mp3s" # Path to the folder where podcast audio files will be initially downloaded
 PODCAST_HISTORY_FILE = "~/podscriber/podcast_history.html" # Path to the HTML file where your podcast archive will be stored
+STATIC_ARCHIVE_ENABLED = False # Set to True to also write a sharded archive (one page per year or podcast plus a compact JSON index) that stays fast to load as the archive grows
+STATIC_ARCHIVE_FOLDER = "~/podscriber/archive" # Path inside REPO_ROOT where the sharded archive is written; it is committed and served by GitHub Pages
+STATIC_ARCHIVE_SHARD_BY = "year" # Split the sharded archive into one page per "year" or per "podcast"
+STATIC_ARCHIVE_FIRST_ROWS = 50 # Rows written straight into each archive page so the newest episodes show before its data file loads
 TRANSCRIBED_FOLDER = "~/podscriber/transcribed"  # Path where transcribed text files are stored
+PODSCRIBER_STATE_DIR = "~/.podscriber" # Path where local state kept between runs is stored (feed cache and similar); keep it outside REPO_ROOT so it is never committed
+RUN_REPORT_KEEP = 30 # Number of JSON run reports (per-stage and per-episode timings) kept in PODSCRIBER_STATE_DIR/run_reports
+METRICS_TEXTFILE = None # Path of a Prometheus text-format file rewritten after every run, e.g. for node_exporter's textfile collector; None to disable
 
 # ChromaDB Integration Settings
 CHROMADB_DB_PATH = "~/podscriber/chroma_db" # Path to the ChromaDB database file
+PASSAGE_COLLECTION_NAME = "podcast_passages" # ChromaDB collection holding transcripts split into overlapping passages for search
+PASSAGE_CHUNK_CHARS = 1000 # Characters per passage; keep it within what the embedding model reads (about 256 tokens for the default model)
+PASSAGE_OVERLAP_CHARS = 200 # Characters shared by neighbouring passages so sentences at the edges are still found
+PASSAGE_BATCH_SIZE = 64 # Number of passages embedded and upserted per ChromaDB call
+SYNC_MODE = "database" # "database" commits the ChromaDB folder itself; "deltas" commits compact append-only delta files instead and rebuilds or patches ChromaDB from them
+SYNC_FOLDER = "~/podscriber/sync" # Path inside REPO_ROOT where delta files are written when SYNC_MODE is "deltas"
+SYNC_INCLUDE_EMBEDDINGS = False # Set to True to store embeddings in the delta files so importing skips re-embedding (makes the deltas several times larger)
 
 # FastAPI and Jinja2 File Paths
 APP_ENTRY = "$Home/podscriber/main.py" # Path to the entry point for the FastAPI application
@@ -19,9 +35,31 @@ WHISPER_SETUP = "~/WhisperSetup" # Path to the WhisperSetup folder
 WHISPER_ROOT = "~/whisper.cpp" # Path to the Whisper root folder
 WHISPER_MODEL_PATH = "~/whisper.cpp/models/ggml-base.en.bin" # Path to the Whisper model file
 WHISPER_EXECUTABLE = "~/whisper.cpp/main" # Path to the Whisper executable
+WHISPER_STREAM_AUDIO = True # Set to True to pipe audio decoded by ffmpeg straight into whisper instead of writing a WAV file; falls back to WAV files if whisper cannot read stdin
+WHISPER_CHUNKED = False # Set to True to split long episodes at silences and transcribe the pieces with several whisper processes at once
+WHISPER_CHUNK_SECONDS = 600 # Target length in seconds of each piece of a long episode
+WHISPER_CHUNK_OVERLAP_SECONDS = 5 # Seconds of audio shared by neighbouring pieces so no words are lost at a cut
+WHISPER_CHUNK_PROCESSES = 4 # Number of whisper processes transcribing the pieces of one episode at the same time
+WHISPER_THREADS_PER_PROCESS = 4 # CPU threads given to each of those whisper processes; aim for WHISPER_WORKERS * WHISPER_CHUNK_PROCESSES * WHISPER_THREADS_PER_PROCESS = number of cores
+WHISPER_SERVER_ENABLED = False # Set to True to keep one whisper server running with the model loaded instead of starting whisper (and reloading the model) for every episode
+WHISPER_SERVER_EXECUTABLE = "~/whisper.cpp/server" # Path to the whisper.cpp server executable (called whisper-server in newer builds)
+WHISPER_SERVER_PORT = 8178 # Local port the whisper server listens on
+WHISPER_SERVER_TIMEOUT_FACTOR = 3 # Seconds the whisper server may take per second of audio before it is considered hung and restarted (at least 300 seconds per episode)
+TRANSCRIPT_CACHE_DIR = "~/.podscriber/transcript_cache" # Path where transcripts are cached by audio hash, model hash and whisper settings so the same audio is never transcribed twice; set to None to disable
+TRANSCRIPT_CACHE_MAX_BYTES = 500 * 1024 * 1024 # Maximum size of the transcript cache on disk; the least recently used transcripts are removed first
 AUTO_OVERWRITE = True  # Set to True to enable FFMPEG tp automatically overwrite files without asking, else False
 AUTO_DELETE_MP3 = True  # Set to True to automatically delete MP3 files in PODCAST_AUDIO_FOLDER after transcription
 
+# Pipeline settings for processing new episodes (downloads, ffmpeg conversions and whisper transcriptions run concurrently)
+DOWNLOAD_WORKERS = 4 # Number of episodes downloaded at the same time
+TRANSCODE_WORKERS = 2 # Number of ffmpeg conversions running at the same time
+WHISPER_WORKERS = 1 # Number of whisper processes running at the same time; each one already uses several CPU threads
+PIPELINE_QUEUE_SIZE = 4 # Maximum number of episodes waiting between two stages; bounds the disk space used by downloaded audio
+DOWNLOAD_RETRIES = 5 # Number of times an interrupted download is resumed from its .part file before giving up
+DOWNLOAD_PARALLEL_THRESHOLD = 64 * 1024 * 1024 # Files at least this many bytes are fetched as parallel byte ranges when the server supports it; set to None to always use one connection
+DOWNLOAD_PARALLEL_RANGES = 4 # Number of byte ranges fetched at the same time for large files
+JOB_MAX_ATTEMPTS = 3 # Number of runs that retry an episode which failed in the pipeline before it is given up; progress is kept in PODSCRIBER_STATE_DIR/jobs.db
+
 # GitHub Integration Settings
 GITHUB_USERNAME = "YOUR_GITHUB_USERNAME" # GitHub username for the repository where files will be committed
 GITHUB_TOKEN = "YOUR_GITHUB_TOKEN" # GitHub token for authentication; generate it from your GitHub account
@@ -33,6 +71,7 @@ ENABLE_GITHUB_COMMIT = True # Set to True to enable committing transcribed text
 # UPLOAD_MP3_FILES = True # Set to True to upload MP3 files to GITHUB_REPO_NAME (in addition to the transcripts)
 UPDATE_HTML_LINKS = True # Set to True to update HTML links in the PODCAST_HISTORY_FILE to point to GitHub URLs
 ENABLE_GITHUB_PAGES = True # Set to True to enable GitHub Pages automatically after processing
+STARTUP_CHECK_TTL = 86400 # Seconds a successful SSH, repository or GitHub Pages check is trusted before it is made again; set to 0 to check on every run
 
 # Configuration for disabling Hugging Face Tokenizer parallelism warning
 TOKENIZERS_PARALLELISM = "false"
@@ -1,33 +1,160 @@
 from fastapi import FastAPI
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-from podscriber import get_podcast_entries
-from config import CHROMADB_DB_PATH
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
+from podscriber import (
+    iter_podcast_entries, read_collection_version, open_search_index, update_search_index,
+    get_transcript_guids, get_query_embedder, search_transcripts, get_template_environment,
+    import_sync_deltas, SYNC_MODE
+)
+from config import CHROMADB_DB_PATH, PASSAGE_COLLECTION_NAME
 import chromadb
 from starlette.requests import Request
+import json
 import os
+import threading
+import time
 
 app = FastAPI()
 
-# Set up Jinja2 templates directory
-templates = Jinja2Templates(directory="templates")
+# Use the same precompiled Jinja2 environment as the history file and the sharded archive
+templates = Jinja2Templates(env=get_template_environment())
 
 # Configuration and Constants
 CHROMADB_DB_PATH = os.path.expanduser(CHROMADB_DB_PATH)
+DEFAULT_PAGE_SIZE = 100  # Entries shown per page on the root page
+MAX_PAGE_SIZE = 1000  # Upper bound for the page_size and limit query parameters
+DEFAULT_SEARCH_RESULTS = 10  # Episodes returned by /search
+MAX_SEARCH_RESULTS = 50  # Upper bound for the k query parameter of /search
+COUNT_CHECK_INTERVAL = 5  # Seconds between collection counts when the database has no version stamp
 
 # Global variable to store ChromaDB client and collection
 client = None
 podcast_collection = None
+passage_collection = None
+
+# Search state built once at startup
+query_embedder = None
+transcript_guids = {}
+
+# Entries cached in memory, rebuilt only when the database version changes
+entries_cache = {"version": None, "entries": []}
+entries_cache_lock = threading.Lock()
+last_count_check = {"time": 0.0, "version": None}
+
+# Return a token that changes whenever podscriber writes to the collection
+def current_collection_version():
+    """Read the version stamp, falling back to an occasional collection count for unstamped databases."""
+    version = read_collection_version(CHROMADB_DB_PATH)
+    if version is not None:
+        return version
+    now = time.monotonic()
+    if last_count_check["version"] is None or now - last_count_check["time"] >= COUNT_CHECK_INTERVAL:
+        last_count_check["version"] = f"count-{podcast_collection.count()}"
+        last_count_check["time"] = now
+    return last_count_check["version"]
+
+# Return the cached entries, reloading them from ChromaDB if the database changed
+def get_cached_entries():
+    """Return (version, entries) for the current database version."""
+    global transcript_guids
+    version = current_collection_version()
+    if entries_cache["version"] == version:
+        return version, entries_cache["entries"]
+    with entries_cache_lock:
+        if entries_cache["version"] != version:
+            entries_cache["entries"] = list(iter_podcast_entries(podcast_collection))
+            transcript_guids = get_transcript_guids(podcast_collection)
+            entries_cache["version"] = version
+            print(f"Loaded {len(entries_cache['entries'])} entries into the cache.")
+        return version, entries_cache["entries"]
+
+# Return a 304 response if the client already has this version of the resource
+def not_modified(request, etag):
+    """Return a 304 Response when If-None-Match matches etag, otherwise None."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
 
 @app.on_event("startup")
 async def startup_event():
-    global client, podcast_collection
+    global client, podcast_collection, passage_collection, query_embedder
     client = chromadb.PersistentClient(path=CHROMADB_DB_PATH)
     podcast_collection = client.get_or_create_collection(name="podcasts")
+    passage_collection = client.get_or_create_collection(name=PASSAGE_COLLECTION_NAME)
     client.heartbeat()
     print("ChromaDB initialized.")
 
+    # Patch the local database with the delta files that arrived since the last start
+    if SYNC_MODE == "deltas":
+        import_sync_deltas(podcast_collection, passage_collection, db_path=CHROMADB_DB_PATH)
+
+    # Index the transcripts for keyword search and load the embedding model before the first query
+    search_conn = open_search_index()
+    try:
+        update_search_index(search_conn)
+    finally:
+        search_conn.close()
+    get_cached_entries()
+    query_embedder = get_query_embedder()
+    query_embedder(["warm up"])
+    print("Search index initialized.")
+
 @app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
-    entries = get_podcast_entries(podcast_collection)  # Fetch dynamic data from ChromaDB
-    return templates.TemplateResponse("index.html", {"request": request, "entries": entries})
+def read_root(request: Request, page: int = 1, page_size: int = DEFAULT_PAGE_SIZE):
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), MAX_PAGE_SIZE)
+    version, cached_entries = get_cached_entries()
+    etag = f'"{version}-{page}-{page_size}"'
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    offset = (page - 1) * page_size
+    entries = cached_entries[offset:offset + page_size]
+    has_next = len(cached_entries) > offset + page_size
+    context = {
+        "request": request,
+        "entries": entries,
+        "page": page,
+        "page_size": page_size,
+        "has_next": has_next,
+    }
+    # Stream the rendered page instead of building the whole document in memory first
+    template = templates.get_template("index.html")
+    return StreamingResponse(template.generate(context), media_type="text/html",
+                             headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.get("/entries.json")
+def read_entries(request: Request, limit: int = None, offset: int = 0):
+    if limit is not None:
+        limit = max(limit, 0)
+    offset = max(offset, 0)
+    version, cached_entries = get_cached_entries()
+    etag = f'"{version}-{limit}-{offset}"'
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    entries = cached_entries[offset:] if limit is None else cached_entries[offset:offset + limit]
+
+    # Stream the JSON array entry by entry
+    def generate():
+        yield "["
+        for i, entry in enumerate(entries):
+            yield ("," if i else "") + json.dumps(entry)
+        yield "]"
+
+    return StreamingResponse(generate(), media_type="application/json",
+                             headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.get("/search")
+def search(q: str, k: int = DEFAULT_SEARCH_RESULTS):
+    k = min(max(k, 1), MAX_SEARCH_RESULTS)
+    # Refreshes transcript_guids too if episodes were added since startup
+    get_cached_entries()
+    search_conn = open_search_index()
+    try:
+        results = search_transcripts(q, podcast_collection, passage_collection, search_conn,
+                                     transcript_guids, query_embedder, k=k)
+    finally:
+        search_conn.close()
+    return {"query": q, "results": results}
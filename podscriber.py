@@ -1,5 +1,4 @@
 import os
-import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import html
@@ -7,10 +6,26 @@ import re
 import subprocess
 import shutil
 import hashlib
-import chromadb
 import random
 import string
 import filecmp
+import threading
+import queue
+import json
+import time
+import csv
+import tempfile
+import atexit
+import contextlib
+import sqlite3
+import socket
+import asyncio
+import httpx
+import gzip
+import base64
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
 
 # Import configuration
 from config import (
@@ -21,7 +36,18 @@ from config import (
     REPO_ROOT, ENABLE_GITHUB_PAGES,
     WHISPER_SETUP, WHISPER_ROOT,CHROMADB_DB_PATH, TOKENIZERS_PARALLELISM,
     USE_EXISTING_DATA, APP_ENTRY, JINJA_TEMPLATES, PUBLIC_SSH_KEY, PRIVATE_SSH_KEY,
-    USE_GITHUB_DEPLOY_KEY, GITHUB_PRO_ACCOUNT
+    USE_GITHUB_DEPLOY_KEY, GITHUB_PRO_ACCOUNT,
+    DOWNLOAD_WORKERS, TRANSCODE_WORKERS, WHISPER_WORKERS, PIPELINE_QUEUE_SIZE,
+    FEED_KNOWN_GUID_RUN, FEED_CHUNK_SIZE, PODSCRIBER_STATE_DIR,
+    DOWNLOAD_RETRIES, DOWNLOAD_PARALLEL_THRESHOLD, DOWNLOAD_PARALLEL_RANGES,
+    WHISPER_STREAM_AUDIO, WHISPER_CHUNKED, WHISPER_CHUNK_SECONDS, WHISPER_CHUNK_OVERLAP_SECONDS,
+    WHISPER_CHUNK_PROCESSES, WHISPER_THREADS_PER_PROCESS,
+    WHISPER_SERVER_ENABLED, WHISPER_SERVER_EXECUTABLE, WHISPER_SERVER_PORT, WHISPER_SERVER_TIMEOUT_FACTOR,
+    TRANSCRIPT_CACHE_DIR, TRANSCRIPT_CACHE_MAX_BYTES,
+    PASSAGE_COLLECTION_NAME, PASSAGE_CHUNK_CHARS, PASSAGE_OVERLAP_CHARS, PASSAGE_BATCH_SIZE,
+    STATIC_ARCHIVE_ENABLED, STATIC_ARCHIVE_FOLDER, STATIC_ARCHIVE_SHARD_BY, STATIC_ARCHIVE_FIRST_ROWS,
+    SYNC_MODE, SYNC_FOLDER, SYNC_INCLUDE_EMBEDDINGS, STARTUP_CHECK_TTL,
+    RUN_REPORT_KEEP, METRICS_TEXTFILE, JOB_MAX_ATTEMPTS
 )
 
 # Set Hugging Face Tokenizers environment variable
@@ -29,6 +55,7 @@ os.environ["TOKENIZERS_PARALLELISM"] = TOKENIZERS_PARALLELISM
 
 def copy_files_to_repo_root():
     """Ensure the APP_ENTRY, JINJA_TEMPLATES, pyproject.toml, config.py, Dockerfile, docker-compose.yaml, podscriber.py, and private SSH key are copied into the Git repository."""
+    # Copied files are queued and go into the single commit made by commit_database_and_files
     app_entry_copy = os.path.join(REPO_ROOT, "main.py")
     jinja_templates_copy = os.path.join(REPO_ROOT, "templates")
     config_copy = os.path.join(REPO_ROOT, "config.py")
@@ -49,8 +76,7 @@ def copy_files_to_repo_root():
         if not os.path.exists(app_entry_copy) or os.path.getmtime(app_entry_copy) < os.path.getmtime(APP_ENTRY):
             print(f"Copying {APP_ENTRY} to {app_entry_copy}")
             shutil.copy(APP_ENTRY, app_entry_copy)
-            run_git_command(["git", "add", app_entry_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update main.py"], REPO_ROOT)
+            queue_git_path(app_entry_copy)
         else:
             print(f"{app_entry_copy} already exists and is up-to-date.")
     else:
@@ -59,13 +85,20 @@ def copy_files_to_repo_root():
     # Check and copy JINJA_TEMPLATES directory
     if os.path.exists(JINJA_TEMPLATES):
         print(f"Found JINJA_TEMPLATES: {JINJA_TEMPLATES}")
-        if not os.path.exists(jinja_templates_copy):
-            print(f"Copying {JINJA_TEMPLATES} to {jinja_templates_copy}")
-            shutil.copytree(JINJA_TEMPLATES, jinja_templates_copy)
-            run_git_command(["git", "add", jinja_templates_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update templates"], REPO_ROOT)
-        else:
-            print(f"{jinja_templates_copy} already exists.")
+        # Compare template by template so existing repositories also receive new and changed templates
+        templates_copied = 0
+        for root, dirs, files in os.walk(JINJA_TEMPLATES):
+            for name in files:
+                template_source = os.path.join(root, name)
+                template_copy = os.path.join(jinja_templates_copy, os.path.relpath(template_source, JINJA_TEMPLATES))
+                if not os.path.exists(template_copy) or not filecmp.cmp(template_source, template_copy, shallow=False):
+                    print(f"Copying {template_source} to {template_copy}")
+                    os.makedirs(os.path.dirname(template_copy), exist_ok=True)
+                    shutil.copy(template_source, template_copy)
+                    queue_git_path(template_copy)
+                    templates_copied += 1
+        if not templates_copied:
+            print(f"{jinja_templates_copy} already exists and is up-to-date.")
     else:
         print(f"JINJA_TEMPLATES not found: {JINJA_TEMPLATES}")
 
@@ -75,8 +108,7 @@ def copy_files_to_repo_root():
         if os.path.exists("config.py"):
             print(f"Copying config.py to {config_copy}")
             shutil.copy("config.py", config_copy)
-            run_git_command(["git", "add", config_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update config.py"], REPO_ROOT)
+            queue_git_path(config_copy)
         else:
             print(f"config.py not found.")
     else:
@@ -86,8 +118,7 @@ def copy_files_to_repo_root():
             if not os.path.exists(config_copy) or os.path.getmtime(config_copy) < os.path.getmtime(config_source):
                 print(f"Copying {config_source} to {config_copy}")
                 shutil.copy(config_source, config_copy)
-                run_git_command(["git", "add", config_copy], REPO_ROOT)
-                run_git_command(["git", "commit", "-m", "Update config.py"], REPO_ROOT)
+                queue_git_path(config_copy)
             else:
                 print(f"{config_copy} already exists and is up-to-date.")
         else:
@@ -99,8 +130,7 @@ def copy_files_to_repo_root():
         if not os.path.exists(pyproject_copy) or os.path.getmtime(pyproject_copy) < os.path.getmtime(pyproject_source):
             print(f"Copying {pyproject_source} to {pyproject_copy}")
             shutil.copy(pyproject_source, pyproject_copy)
-            run_git_command(["git", "add", pyproject_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update pyproject.toml"], REPO_ROOT)
+            queue_git_path(pyproject_copy)
         else:
             print(f"{pyproject_copy} already exists and is up-to-date.")
     else:
@@ -112,8 +142,7 @@ def copy_files_to_repo_root():
         if not os.path.exists(dockerfile_copy) or os.path.getmtime(dockerfile_copy) < os.path.getmtime(dockerfile_source):
             print(f"Copying {dockerfile_source} to {dockerfile_copy}")
             shutil.copy(dockerfile_source, dockerfile_copy)
-            run_git_command(["git", "add", dockerfile_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update Dockerfile"], REPO_ROOT)
+            queue_git_path(dockerfile_copy)
         else:
             print(f"{dockerfile_copy} already exists and is up-to-date.")
     else:
@@ -125,8 +154,7 @@ def copy_files_to_repo_root():
         if not os.path.exists(docker_compose_copy) or os.path.getmtime(docker_compose_copy) < os.path.getmtime(docker_compose_source):
             print(f"Copying {docker_compose_source} to {docker_compose_copy}")
             shutil.copy(docker_compose_source, docker_compose_copy)
-            run_git_command(["git", "add", docker_compose_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update docker-compose.yaml"], REPO_ROOT)
+            queue_git_path(docker_compose_copy)
         else:
             print(f"{docker_compose_copy} already exists and is up-to-date.")
     else:
@@ -138,8 +166,7 @@ def copy_files_to_repo_root():
         if not os.path.exists(podscriber_copy) or os.path.getmtime(podscriber_copy) < os.path.getmtime(os.path.join(script_dir, "podscriber.py")):
             print(f"Copying podscriber.py to {podscriber_copy}")
             shutil.copy(os.path.join(script_dir, "podscriber.py"), podscriber_copy)
-            run_git_command(["git", "add", podscriber_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update podscriber.py"], REPO_ROOT)
+            queue_git_path(podscriber_copy)
         else:
             print(f"{podscriber_copy} already exists and is up-to-date.")
     else:
@@ -153,8 +180,7 @@ def copy_files_to_repo_root():
         if not os.path.exists(private_ssh_key_copy) or not filecmp.cmp(private_ssh_key_source, private_ssh_key_copy):
             print(f"Copying {private_ssh_key_source} to {private_ssh_key_copy}")
             shutil.copy(private_ssh_key_source, private_ssh_key_copy)
-            run_git_command(["git", "add", private_ssh_key_copy], REPO_ROOT)
-            run_git_command(["git", "commit", "-m", "Update private SSH key"], REPO_ROOT)
+            queue_git_path(private_ssh_key_copy)
         else:
             print(f"{private_ssh_key_copy} already exists and is up-to-date.")
     else:
@@ -166,63 +192,196 @@ PODCAST_AUDIO_FOLDER = os.path.expanduser(PODCAST_AUDIO_FOLDER)
 PODCAST_HISTORY_FILE = os.path.expanduser(PODCAST_HISTORY_FILE)
 TRANSCRIBED_FOLDER = os.path.join(REPO_ROOT, "transcribed")
 CHROMADB_DB_PATH = os.path.expanduser(CHROMADB_DB_PATH)
+PODSCRIBER_STATE_DIR = os.path.expanduser(PODSCRIBER_STATE_DIR)
+FEED_STATE_FILE = os.path.join(PODSCRIBER_STATE_DIR, "feed_state.json")
+STARTUP_CHECKS_FILE = os.path.join(PODSCRIBER_STATE_DIR, "startup_checks.json")
+RUN_REPORT_FOLDER = os.path.join(PODSCRIBER_STATE_DIR, "run_reports")
+METRICS_TEXTFILE = os.path.expanduser(METRICS_TEXTFILE) if METRICS_TEXTFILE else None
+TRANSCRIPT_CACHE_DIR = os.path.expanduser(TRANSCRIPT_CACHE_DIR) if TRANSCRIPT_CACHE_DIR else None
+SEARCH_INDEX_FILE = os.path.join(PODSCRIBER_STATE_DIR, "search_index.db")
+JOB_QUEUE_FILE = os.path.join(PODSCRIBER_STATE_DIR, "jobs.db")
+HASH_CACHE_FILE = os.path.join(PODSCRIBER_STATE_DIR, "chroma_hash_cache.json")
+PASSAGE_BACKFILL_FILE = os.path.join(PODSCRIBER_STATE_DIR, "passage_backfill.json")
+HISTORY_MANIFEST_FILE = os.path.join(PODSCRIBER_STATE_DIR, "history_manifest.json")
+HISTORY_ROWS_END_MARKER = "<!-- podscriber:rows-end -->"  # Marks where new rows are spliced into PODCAST_HISTORY_FILE
+HISTORY_LAYOUT_VERSION = 3  # Bump when the header, footer or rows change so existing history files are rendered again
+STATIC_ARCHIVE_FOLDER = os.path.expanduser(STATIC_ARCHIVE_FOLDER)
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_CACHE_DIR = os.path.join(PODSCRIBER_STATE_DIR, "template_cache")
+MONTH_NUMBERS = {month: number for number, month in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1)}
+ARCHIVE_FIELDS = ["podcast", "episode", "date", "transcript", "mp3", "link", "guid"]  # Column order of the archive data files
+SYNC_FOLDER = os.path.expanduser(SYNC_FOLDER)
+SYNC_STATE_FILE = "podscriber_sync_state.json"  # Deltas applied to and exported from the database, kept inside CHROMADB_DB_PATH
+SYNC_EXPORT_BATCH_SIZE = 100  # Episodes read from ChromaDB per query while writing a delta
+COLLECTION_VERSION_FILE = "podscriber_version.txt"  # Stamp inside CHROMADB_DB_PATH rewritten whenever episodes change
+
+# File hashing tuning
+HASH_READ_SIZE = 1024 * 1024  # Bytes read per call while hashing a file
+HASH_WORKERS = 4  # Files hashed at the same time when several ChromaDB files changed
+HASH_RACY_WINDOW_NS = 2 * 10**9  # Files modified this close to a scan are hashed again next time, as their mtime may not move on the next write
+
+# ChromaDB client and collections, opened by init_chromadb once a run knows it has work to do
+client = None
+podcast_collection = None
+passage_collection = None
+
+# Git subprocesses started during this run, printed at the end and kept in the run report
+git_subprocess_count = 0
+
+# Paths changed during this run that go into its single commit
+pending_git_paths = []
+
+# Episodes that failed somewhere in the pipeline during this run
+failed_episodes = []
+
+# Job table recording how far each episode got, shared by the pipeline threads
+job_queue_conn = None
+job_queue_lock = threading.Lock()
+JOB_STAGES = ("queued", "downloaded", "transcoded", "transcribed", "indexed", "committed")  # Order in which a job moves through the pipeline
+JOB_FIELDS = ("metadata", "mp3_url", "full_title", "mp3_file_path", "filename", "cache_key", "wav_file", "transcript_file")  # Episode keys kept with a job
+JOB_CLAIM_TIMEOUT = 6 * 3600  # Seconds after which a claim held by a process on another machine is treated as abandoned
+JOB_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"  # Owner written on the jobs this process claims
+
+# Timed spans of this run, written to the run report when the script exits
+run_spans = []
+run_spans_lock = threading.Lock()
+run_started_at = time.time()
+WAV_BYTES_PER_SECOND = 16000 * 2  # 16 kHz mono 16-bit PCM, as written by convert_to_wav
+
+# Download tuning
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # Bytes written to disk per read while downloading audio
+DOWNLOAD_TIMEOUT = (10, 60)  # Connect and read timeouts in seconds for audio downloads
+
+# Set to False once whisper fails to read audio from stdin, so later episodes go straight to WAV files
+whisper_reads_stdin = None
+
+# Long-lived whisper server process that keeps the model loaded between episodes
+whisper_server_process = None
+whisper_server_lock = threading.Lock()
+WHISPER_SERVER_STARTUP_TIMEOUT = 120  # Seconds to wait for the whisper server to load the model
+WHISPER_SERVER_MIN_TIMEOUT = 300  # Seconds a transcription request may take however short the audio is
+
+# Transcript cache state
+whisper_model_hash_value = None
+transcript_cache_lock = threading.Lock()
+
+# Jinja2 environment shared by the history file, the sharded archive and the web app
+template_environment = None
+template_environment_lock = threading.Lock()
+
+# Shared HTTP session so downloads reuse pooled keep-alive connections
+http_session = None
+http_session_lock = threading.Lock()
+
+# Event loop thread and pooled httpx client for GitHub API and feed requests
+async_loop = None
+async_loop_lock = threading.Lock()
+async_client = None
+ASYNC_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)  # Timeouts for GitHub API and feed requests
+ASYNC_HTTP_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)  # Pool shared by concurrent requests
+
+# Results of the network checks dispatched together at startup, consumed by take_startup_result
+startup_results = {}
+
+# Search tuning
+SEARCH_RRF_K = 60  # Rank offset used when fusing keyword and vector results; higher values flatten the ranking
+SEARCH_SNIPPET_TOKENS = 32  # Words shown around the matches in a keyword snippet
+SEARCH_SNIPPET_CHARS = 300  # Characters shown from a matching passage when there is no keyword snippet
+
+# Build the entry shown in the web app for one episode
+def build_podcast_entry(guid, metadata):
+    """Turn the ChromaDB metadata of an episode into the dictionary rendered by the templates."""
+    # Extract metadata fields, with defaults for missing data
+    podcast_name = metadata.get("podcast_name", "Unknown Podcast")
+    episode_title = metadata.get("episode_title", "Unknown Episode")
+    listen_date = metadata.get("listenDate", "Unknown Date")
+    mp3_url = metadata.get("mp3_url", "#")  
+    link = metadata.get("link", "#")  
+
+    # Construct the transcript URL
+    transcript_github_url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/main/transcribed/{normalize_folder_name(podcast_name)}/{normalize_folder_name(episode_title)}.txt"
+
+    return {
+        "podcast_name": podcast_name,
+        "episode_title": episode_title,
+        "listen_date": listen_date,
+        "transcript_url": transcript_github_url,
+        "mp3_url": mp3_url,
+        "link": link,
+        "guid": guid
+    }
 
 # Get podcast entries from ChromaDB
-def get_podcast_entries(podcast_collection):
-    # Query all documents from the ChromaDB collection
-    results = podcast_collection.get()
-
-    # Initialize an empty list to store the entries
-    entries = []
-
-    # Check if results contain documents
-    if 'documents' in results and len(results['documents']) > 0:
-        documents = results['documents']
-        ids = results['ids']
-        metadatas = results.get('metadatas', [])
-        
-        # Loop through each document and metadata
-        for document, guid, metadata in zip(documents, ids, metadatas):
-            # Extract metadata fields, with defaults for missing data
-            podcast_name = metadata.get("podcast_name", "Unknown Podcast")
-            episode_title = metadata.get("episode_title", "Unknown Episode")
-            listen_date = metadata.get("listenDate", "Unknown Date")
-            mp3_url = metadata.get("mp3_url", "#")  
-            link = metadata.get("link", "#")  
-
-            # Construct the transcript URL
-            transcript_github_url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/main/transcribed/{normalize_folder_name(podcast_name)}/{normalize_folder_name(episode_title)}.txt"
-
-            # Update metadata with mp3_url and transcript_url
-            metadata['mp3_url'] = mp3_url
-            metadata['transcript_url'] = transcript_github_url  # Now this is defined
-
-            # Append each entry as a dictionary
-            entries.append({
-                "podcast_name": podcast_name,
-                "episode_title": episode_title,
-                "listen_date": listen_date,
-                "transcript_url": transcript_github_url,  # Ensure this is included
-                "mp3_url": mp3_url,
-                "link": link,
-                "guid": guid
-            })
+def get_podcast_entries(podcast_collection, limit=None, offset=None):
+    """Return one page of entries, fetching only the metadata and never the transcript documents."""
+    results = podcast_collection.get(include=["metadatas"], limit=limit, offset=offset)
+    return [build_podcast_entry(guid, metadata or {}) for guid, metadata in zip(results['ids'], results['metadatas'])]
+
+# Yield podcast entries page by page so memory use does not grow with the archive
+def iter_podcast_entries(podcast_collection, page_size=500, limit=None, offset=0):
+    """Yield up to limit entries starting at offset, fetching page_size entries per ChromaDB query."""
+    remaining = limit
+    while remaining is None or remaining > 0:
+        batch_size = page_size if remaining is None else min(page_size, remaining)
+        entries = get_podcast_entries(podcast_collection, limit=batch_size, offset=offset)
+        yield from entries
+        if len(entries) < batch_size:
+            return
+        offset += len(entries)
+        if remaining is not None:
+            remaining -= len(entries)
+
+# Record that the episodes in the database changed so readers can drop cached copies
+def write_collection_version(db_path=CHROMADB_DB_PATH):
+    """Write a new version stamp next to the ChromaDB files."""
+    os.makedirs(db_path, exist_ok=True)
+    stamp_file = os.path.join(db_path, COLLECTION_VERSION_FILE)
+    tmp_file = f"{stamp_file}.tmp"
+    with open(tmp_file, "w") as f:
+        f.write(str(time.time_ns()))
+    os.replace(tmp_file, stamp_file)
+
+# Read the version stamp written by write_collection_version
+def read_collection_version(db_path=CHROMADB_DB_PATH):
+    """Return the current version stamp, or None if the database has never been stamped."""
+    try:
+        with open(os.path.join(db_path, COLLECTION_VERSION_FILE), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
 
-    return entries
+# Get the GUIDs of all processed episodes from ChromaDB in one query
+def get_known_guids(podcast_collection):
+    """Return the set of GUIDs already stored in the collection, fetching only the ids."""
+    return set(podcast_collection.get(include=[])['ids'])
 
 # Check if git is installed and error out if not
 def check_git_installed():
     """Ensure git is installed on the system."""
-    try:
-        subprocess.run(["git", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # Looking git up on PATH is enough here and avoids starting a process on every run
+    if shutil.which("git"):
         print("Git is installed.")
-    except subprocess.CalledProcessError:
+    else:
         print("Git is not installed. Please install git before running the script.")
         exit(1)
 
+# Run a git command, counting it towards the subprocesses started this run
+def run_git(command, cwd):
+    """Run a git command and return the completed process with its text output."""
+    global git_subprocess_count
+    git_subprocess_count += 1
+    return subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+
+# Queue a path for the single commit made at the end of the run
+def queue_git_path(path):
+    """Remember a changed path so commit_database_and_files stages it together with everything else."""
+    if path not in pending_git_paths:
+        pending_git_paths.append(path)
+
 # Ensure that each Git command checks for successful execution and handles failures appropriately
 def run_git_command(command, cwd):
-    result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+    result = run_git(command, cwd)
     if result.returncode != 0:
         print(f"Git command {' '.join(command)} failed with error: {result.stderr}")
         return False
@@ -352,38 +511,133 @@ def update_config_with_keys(public_key_name, private_key_name):
     PUBLIC_SSH_KEY = config.PUBLIC_SSH_KEY
     PRIVATE_SSH_KEY = config.PRIVATE_SSH_KEY
 
-def add_deploy_key_to_repo(repo_name, public_key):
-    """Add the public SSH key as a deploy key to the GitHub repository."""
+# Return the event loop running in the background thread, starting it on first use
+def get_async_loop():
+    """Return the event loop that runs the async HTTP requests, started in a daemon thread."""
+    global async_loop
+    with async_loop_lock:
+        if async_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="podscriber-async", daemon=True).start()
+            atexit.register(close_async_loop)
+            async_loop = loop
+    return async_loop
+
+# Return the pooled httpx client; only called from coroutines running on the async loop
+def get_async_client():
+    """Return the shared httpx.AsyncClient, keeping connections alive between requests."""
+    global async_client
+    if async_client is None:
+        async_client = httpx.AsyncClient(timeout=ASYNC_HTTP_TIMEOUT, limits=ASYNC_HTTP_LIMITS, follow_redirects=True)
+    return async_client
+
+# Run a coroutine on the async loop and wait for its result, so blocking code can call async requests
+def run_async(coroutine):
+    """Run the coroutine on the background event loop and return its result."""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_async_loop()).result()
+
+# Run several coroutines at once on the async loop
+def run_concurrently(coroutines):
+    """Return the results of the coroutines in order, with exceptions returned instead of raised."""
+    async def gather():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+    return run_async(gather())
+
+# Close the pooled client and stop the async loop when the script exits
+def close_async_loop():
+    """Close the httpx client and stop the background event loop."""
+    if async_client is not None:
+        run_async(async_client.aclose())
+    async_loop.call_soon_threadsafe(async_loop.stop)
+
+# Send a request to the GitHub REST API with the shared client
+async def github_api_request_async(method, url, json=None):
+    """Send an authenticated GitHub API request and return the httpx response."""
     headers = {
         "Authorization": f"token {GITHUB_TOKEN}",
         "Accept": "application/vnd.github.v3+json"
     }
+    return await get_async_client().request(method, url, headers=headers, json=json)
+
+# Check whether the GitHub repository exists
+async def github_repo_exists_async(repo_name):
+    """Return True if the repository exists, False if GitHub answers 404."""
+    url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}"
+    response = await github_api_request_async("GET", url)
+    return response.status_code != 404
+
+# Check if GitHub Pages is already enabled
+async def check_github_pages_enabled_async():
+    """Check if GitHub Pages is already enabled."""
+    url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/pages"
+    response = await github_api_request_async("GET", url)
+    return response.status_code == 200
+
+# Dispatch the independent network checks of a run at once, so startup waits only for the slowest one
+def run_startup_checks():
+    """Run the SSH, repository, GitHub Pages and feed checks concurrently and store their results."""
+    # Checks that passed within STARTUP_CHECK_TTL are trusted; only failures and expired checks are made again
+    cached_checks = load_state_file(STARTUP_CHECKS_FILE)
+    cache_key = f"{GITHUB_USERNAME}/{GITHUB_REPO_NAME}"
+    passed_at = cached_checks.get(cache_key, {})
+    now = time.time()
+
+    checks = {}
+    if ENABLE_GITHUB_COMMIT and GITHUB_USERNAME != "your_github_username":
+        checks["ssh"] = lambda: asyncio.to_thread(check_github_ssh_connection)
+    if GITHUB_REPO_CHECK:
+        checks["repo"] = lambda: github_repo_exists_async(GITHUB_REPO_NAME)
+    if ENABLE_GITHUB_PAGES and not (GITHUB_REPO_PRIVATE and not GITHUB_PRO_ACCOUNT):
+        checks["pages"] = check_github_pages_enabled_async
+    for name in list(checks):
+        if now - passed_at.get(name, 0) < STARTUP_CHECK_TTL:
+            print(f"Skipping the {name} check; it passed {int(now - passed_at[name])} seconds ago.")
+            startup_results[name] = True
+            del checks[name]
+    if not USE_EXISTING_DATA:
+        checks["feed"] = lambda: request_feed_async(RSS_FEED_URL, load_feed_state(RSS_FEED_URL))
+    if not checks:
+        return
+
+    results = dict(zip(checks, run_concurrently([start() for start in checks.values()])))
+    startup_results.update(results)
+
+    passed = {name: now for name, result in results.items() if name != "feed" and result is True}
+    if passed:
+        cached_checks[cache_key] = {**passed_at, **passed}
+        save_state_file(STARTUP_CHECKS_FILE, cached_checks)
+
+# Return the result of a startup check once, re-raising the exception it failed with
+def take_startup_result(name):
+    """Return and forget the stored result of a startup check, or None if it was not run."""
+    result = startup_results.pop(name, None)
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+def add_deploy_key_to_repo(repo_name, public_key):
+    """Add the public SSH key as a deploy key to the GitHub repository."""
     url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}/keys"
     data = {
         "title": f"Deploy Key for {repo_name}",
         "key": open(public_key).read(),
         "read_only": True
     }
-    response = requests.post(url, headers=headers, json=data)
+    response = run_async(github_api_request_async("POST", url, json=data))
     response.raise_for_status()
     print(f"Deploy key added to {repo_name}.")
 
-def check_create_github_repo(repo_name):
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{repo_name}"
-
-    response = requests.get(url, headers=headers)
-    if response.status_code == 404:
+def check_create_github_repo(repo_name, exists=None):
+    if exists is None:
+        exists = run_async(github_repo_exists_async(repo_name))
+    if not exists:
         print(f"Repository {repo_name} not found. Creating new repository...")
         create_repo_url = "https://api.github.com/user/repos"
         data = {
             "name": repo_name,
             "private": GITHUB_REPO_PRIVATE
         }
-        create_response = requests.post(create_repo_url, headers=headers, json=data)
+        create_response = run_async(github_api_request_async("POST", create_repo_url, json=data))
         create_response.raise_for_status()
         print(f"Repository {repo_name} created successfully.")
 
@@ -409,7 +663,7 @@ def initialize_local_git_repo(repo_root):
         if is_git_repo(repo_root):
             print(f"Git repository already initialized in {repo_root}.")
             # Check if 'main' branch exists
-            result = subprocess.run(["git", "show-ref", "--verify", "--quiet", "refs/heads/main"], cwd=repo_root)
+            result = run_git(["git", "show-ref", "--verify", "--quiet", "refs/heads/main"], repo_root)
             if result.returncode != 0:
                 print("Creating 'main' branch...")
                 run_git_command(["git", "checkout", "-b", "main"], repo_root)
@@ -425,7 +679,7 @@ def initialize_local_git_repo(repo_root):
 def ensure_initial_commit(repo_root):
     """Ensure there's an initial commit in the repository."""
     # Check if there are any commits
-    result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_root, capture_output=True, text=True)
+    result = run_git(["git", "rev-parse", "HEAD"], repo_root)
     if result.returncode != 0:
         print("No commits found. Creating initial commit...")
         # Create a README.md file
@@ -477,13 +731,7 @@ def create_initial_commit(repo_root):
 # Check if GitHub Pages is already enabled
 def check_github_pages_enabled():
     """Check if GitHub Pages is already enabled."""
-    url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/pages"
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    response = requests.get(url, headers=headers)
-    return response.status_code == 200
+    return run_async(check_github_pages_enabled_async())
 
 # Enable GitHub Pages for the repository and update the README.md with the PODCAST_HISTORY_FILE link
 def enable_github_pages():
@@ -497,19 +745,19 @@ def enable_github_pages():
     history_filename = os.path.basename(PODCAST_HISTORY_FILE)
     archive_url = f"https://{GITHUB_USERNAME}.github.io/{GITHUB_REPO_NAME}/{history_filename}"
 
-    if check_github_pages_enabled():
+    # Reuse the answer of the check made at startup, if there was one
+    pages_enabled = take_startup_result("pages")
+    if pages_enabled is None:
+        pages_enabled = check_github_pages_enabled()
+    if pages_enabled:
         print(f"GitHub Pages is already enabled for {GITHUB_REPO_NAME}.")
         print(f"Visit your site at: {archive_url}")
         return
 
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json"
-    }
     url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/pages"
 
     # Ensure the `main` branch exists before enabling GitHub Pages
-    result = subprocess.run(["git", "rev-parse", "--verify", "origin/main"], cwd=REPO_ROOT, capture_output=True, text=True)
+    result = run_git(["git", "rev-parse", "--verify", "origin/main"], REPO_ROOT)
     if result.returncode != 0:
         print("The 'main' branch does not exist yet. Skipping GitHub Pages setup.")
         return
@@ -522,7 +770,7 @@ def enable_github_pages():
         }
     }
     
-    response = requests.post(url, headers=headers, json=data)
+    response = run_async(github_api_request_async("POST", url, json=data))
     if response.status_code in [201, 204]:
         print(f"GitHub Pages enabled for repository {GITHUB_REPO_NAME}.")
         print(f"Visit your site at: {archive_url}")
@@ -568,38 +816,59 @@ def update_readme_with_archive_link(repo_root, archive_url):
 def file_hash(filepath):
     """Calculate the SHA-256 hash of the given file."""
     sha256 = hashlib.sha256()
-    with open(filepath, 'rb') as f:
-        for block in iter(lambda: f.read(4096), b''):
-            sha256.update(block)
+    buffer = bytearray(HASH_READ_SIZE)
+    view = memoryview(buffer)
+    # Large reads into one reused buffer; hashlib releases the GIL for them, so files hash in parallel threads
+    with open(filepath, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            sha256.update(view[:size])
     return sha256.hexdigest()
 
-# Pull a file from GitHub and save it locally
-def pull_github_file(repo_name, filepath, destination):
-    """Pull a file from GitHub and save it locally."""
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3.raw"
-    }
-    url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{repo_name}/main/{filepath}"
-    
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    
-    with open(destination, 'wb') as f:
-        f.write(response.content)
-    
-    print(f"Pulled {filepath} from GitHub and saved to {destination}.")
-
-# Check if the repository has an initial commit
-def has_initial_commit(repo_root):
-    """Check if the repository has an initial commit."""
-    result = subprocess.run(
-        ["git", "rev-parse", "--verify", "HEAD"],
-        cwd=repo_root,
-        capture_output=True,
-        text=True
-    )
-    return result.returncode == 0
+# Parse the output of git status --porcelain=v2 --branch -z
+def parse_git_status(output):
+    """Return (branch headers, changed paths) from porcelain v2 status output."""
+    headers = {}
+    paths = []
+    entries = output.split("\0")
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        if entry.startswith("# "):
+            key, _, value = entry[2:].partition(" ")
+            headers[key] = value
+        elif entry.startswith("1 "):
+            paths.append(entry.split(" ", 8)[8])
+        elif entry.startswith("2 "):
+            paths.append(entry.split(" ", 9)[9])
+            i += 1  # The original path of a rename follows as its own entry
+        elif entry.startswith("u "):
+            paths.append(entry.split(" ", 10)[10])
+        elif entry.startswith("? "):
+            paths.append(entry[2:])
+        i += 1
+    return headers, paths
+
+# Check whether a path reported by git status lies inside, or contains, a path we commit
+def path_overlaps(status_path, commit_path):
+    """Return True if the two repository-relative paths are the same or one contains the other."""
+    status_path = status_path.rstrip("/")
+    return (status_path == commit_path or status_path.startswith(commit_path + "/")
+            or commit_path.startswith(status_path + "/"))
+
+# Check whether origin/main was seen by an earlier fetch or push, reading the refs instead of asking the remote
+def remote_branch_known(repo_root, branch="main"):
+    """Return True if the repository has a remote-tracking ref for origin/<branch>."""
+    git_dir = os.path.join(repo_root, ".git")
+    if os.path.exists(os.path.join(git_dir, "refs", "remotes", "origin", branch)):
+        return True
+    try:
+        with open(os.path.join(git_dir, "packed-refs"), "r") as f:
+            return any(line.rstrip("\n").endswith(f" refs/remotes/origin/{branch}") for line in f)
+    except FileNotFoundError:
+        return False
 
 # Commit changes to the database directory, HTML file, and new transcribed files
 def commit_database_and_files(repo_root, db_path, history_file, new_files):
@@ -613,135 +882,125 @@ def commit_database_and_files(repo_root, db_path, history_file, new_files):
         return False
 
     try:
-        # Check if there is an initial commit
-        has_commit = has_initial_commit(repo_root)
+        # Everything this run may have changed goes into one add and one commit
+        hash_file = os.path.join(repo_root, 'chroma_hashes.txt')
+        paths = list(pending_git_paths) + [history_file]
+        if db_path:
+            paths.append(db_path)
+        if os.path.exists(TRANSCRIBED_FOLDER):
+            paths.append(TRANSCRIBED_FOLDER)
+        if os.path.exists(hash_file):
+            paths.append(hash_file)
+        if STATIC_ARCHIVE_ENABLED and os.path.exists(STATIC_ARCHIVE_FOLDER):
+            paths.append(STATIC_ARCHIVE_FOLDER)
+        if SYNC_MODE == "deltas" and os.path.exists(SYNC_FOLDER):
+            paths.append(SYNC_FOLDER)
+        commit_paths = [os.path.relpath(path, repo_root).replace('\\', '/') for path in paths]
+
+        # One status call tells whether HEAD exists, whether origin/main is tracked and ahead, and what changed
+        status = run_git(["git", "status", "--porcelain=v2", "--branch", "-z"], repo_root)
+        if status.returncode != 0:
+            print(f"Git status failed with error: {status.stderr}")
+            return False
+        headers, changed_paths = parse_git_status(status.stdout)
 
-        if not has_commit:
+        if headers.get("branch.oid") == "(initial)":
             print("No initial commit found. Creating initial commit.")
             create_initial_commit(repo_root)
-            # After creating the initial commit, proceed with adding and pushing new files
-
-        # Check for uncommitted changes before stashing
-        status = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True
-        ).stdout
-        if status.strip():
-            # Uncommitted changes exist, stash them
-            if not run_git_command(["git", "stash"], cwd=repo_root):
-                print("Failed to stash changes.")
-                return False
-        else:
-            print("No changes to stash.")
+            headers = {}
 
-        # Pull latest changes
-        if not run_git_command(["git", "pull", "--rebase", "origin", "main"], cwd=repo_root):
-            print("Failed to pull latest changes.")
+        # branch.ab ("+ahead -behind") is only reported when the upstream ref exists locally
+        ahead = int(headers.get("branch.ab", "+0 -0").split()[0])
+        remote_known = "branch.ab" in headers or remote_branch_known(repo_root)
+        changed = [path for path in changed_paths if any(path_overlaps(path, commit_path) for commit_path in commit_paths)]
+        if not changed and not ahead:
+            print("No changes to commit for the database, HTML, or podcast files.")
+            # Everything indexed so far is already in the pushed commits
+            mark_jobs_committed()
             return False
 
-        # Try to pop the stash, but continue even if there's nothing to pop
-        result = subprocess.run(
-            ["git", "stash", "pop"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True
-        )
-        if result.returncode != 0:
-            if "No stash entries found" in result.stderr or "No stash entries found" in result.stdout:
-                print("No stash entries to pop.")
-            else:
-                print(f"Error during git stash pop: {result.stderr}")
-                return False
-
-        # Stage the entire ChromaDB database directory
-        if db_path:
-            print(f"Adding to Git: {os.path.relpath(db_path, repo_root)}")
-            if not run_git_command(
-                ["git", "add", os.path.relpath(db_path, repo_root)],
-                cwd=repo_root
-            ):
-                print("Failed to add database directory to Git.")
-                return False
-
-        # Stage the HTML file
-        print(f"Adding to Git: {os.path.relpath(history_file, repo_root)}")
-        if not run_git_command(
-            ["git", "add", os.path.relpath(history_file, repo_root)],
-            cwd=repo_root
-        ):
-            print("Failed to add history file to Git.")
+        # Rebase onto the remote first; --autostash sets uncommitted files aside and restores them in the same call
+        pull_command = ["git", "pull", "--rebase", "--autostash", "origin", "main"]
+        if remote_known and not run_git_command(pull_command, cwd=repo_root):
+            print("Failed to pull latest changes.")
             return False
 
-        # Stage the transcribed folder if it exists
-        if os.path.exists(TRANSCRIBED_FOLDER):
-            print(f"Adding to Git: {os.path.relpath(TRANSCRIBED_FOLDER, repo_root)}")
-            if not run_git_command(
-                ["git", "add", os.path.relpath(TRANSCRIBED_FOLDER, repo_root)],
-                cwd=repo_root
-            ):
-                print("Failed to add transcribed folder to Git.")
+        if changed:
+            print(f"Adding to Git: {', '.join(commit_paths)}")
+            if not run_git_command(["git", "add", "--all", "--"] + commit_paths, cwd=repo_root):
+                print("Failed to add files to Git.")
                 return False
-
-        # Stage the updated chroma_hashes.txt file
-        hash_file = os.path.join(repo_root, 'chroma_hashes.txt')
-        if os.path.exists(hash_file):
-            print(f"Adding to Git: {os.path.relpath(hash_file, repo_root)}")
-            if not run_git_command(
-                ["git", "add", os.path.relpath(hash_file, repo_root)],
-                cwd=repo_root
-            ):
-                print("Failed to add chroma_hashes.txt to Git.")
-                return False
-
-        # Debugging: Print git status
-        status_result = subprocess.run(
-            ["git", "status"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True
-        )
-        print(f"Git status output:\n{status_result.stdout}")
-
-        # Check if there are any changes to commit
-        status = subprocess.run(
-            ["git", "status", "--porcelain"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True
-        ).stdout
-        if status.strip():
-            if not run_git_command(
-                ["git", "commit", "-m", "Update database, HTML, and podcast files"],
-                cwd=repo_root
-            ):
+            if not run_git_command(["git", "commit", "-m", "Update database, HTML, and podcast files"], cwd=repo_root):
                 print("Failed to commit changes.")
                 return False
+        pending_git_paths.clear()
+
+        # Set the upstream the first time main is pushed; if the remote moved on meanwhile, rebase once and retry
+        push_command = ["git", "push", "origin", "main"] if remote_known else ["git", "push", "-u", "origin", "main"]
+        if not run_git_command(push_command, cwd=repo_root):
+            if not (run_git_command(pull_command, cwd=repo_root)
+                    and run_git_command(["git", "push", "-u", "origin", "main"], cwd=repo_root)):
+                print("Failed to push changes to remote.")
+                return False
 
-            # Check if 'main' branch exists on remote
-            result = subprocess.run(["git", "ls-remote", "--exit-code", "--heads", "origin", "main"], cwd=repo_root, capture_output=True)
-            if result.returncode != 0:
-                print("'main' branch doesn't exist on remote. Pushing current branch.")
-                current_branch = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_root, capture_output=True, text=True).stdout.strip()
-                if not run_git_command(["git", "push", "-u", "origin", current_branch], cwd=repo_root):
-                    print(f"Failed to push {current_branch} to remote.")
-                    return False
-            else:
-                if not run_git_command(["git", "push", "origin", "main"], cwd=repo_root):
-                    print("Failed to push changes to remote.")
-                    return False
-
-            print("Database, HTML, and podcast files committed and pushed.")
-            return True
-        else:
-            print("No changes to commit for the database, HTML, or podcast files.")
-            return False
+        print("Database, HTML, and podcast files committed and pushed.")
+        return True
 
     except Exception as e:
         print(f"Failed to commit changes: {e}")
         return False
 
+# Split a transcript into overlapping passages small enough for the embedding model
+def split_transcript_into_passages(transcript_text):
+    """Return a list of (start_offset, end_offset, text) passages of about PASSAGE_CHUNK_CHARS characters."""
+    passages = []
+    length = len(transcript_text)
+    start = 0
+    while start < length:
+        end = min(start + PASSAGE_CHUNK_CHARS, length)
+        # End the passage at a word boundary unless that would make it very short
+        if end < length:
+            boundary = transcript_text.rfind(" ", start + PASSAGE_CHUNK_CHARS // 2, end)
+            if boundary != -1:
+                end = boundary
+        passage = transcript_text[start:end].strip()
+        if passage:
+            passages.append((start, end, passage))
+        if end >= length:
+            break
+        # Start the next passage PASSAGE_OVERLAP_CHARS earlier, at a word boundary
+        next_start = max(end - PASSAGE_OVERLAP_CHARS, start + 1)
+        boundary = transcript_text.find(" ", next_start, end)
+        start = boundary + 1 if boundary != -1 else next_start
+    return passages
+
+# Add the transcript of an episode to the passages collection in overlapping, batched chunks
+def add_passages_to_db_chroma(metadata, transcript_text, collection=None):
+    """Replace the passages of an episode in the passages collection with freshly embedded ones."""
+    collection = collection or passage_collection
+    guid = metadata['guid']
+    passages = split_transcript_into_passages(transcript_text)
+
+    # Drop passages from an earlier version of the transcript
+    collection.delete(where={"guid": guid})
+
+    for batch_start in range(0, len(passages), PASSAGE_BATCH_SIZE):
+        batch = passages[batch_start:batch_start + PASSAGE_BATCH_SIZE]
+        collection.upsert(
+            ids=[f"{guid}#{batch_start + i}" for i in range(len(batch))],
+            documents=[text for _, _, text in batch],
+            metadatas=[{
+                "guid": guid,
+                "podcast_name": metadata['podcast_name'],
+                "episode_title": metadata['episode_title'],
+                "passage_index": batch_start + i,
+                "start_offset": start,
+                "end_offset": end,
+            } for i, (start, end, _) in enumerate(batch)]
+        )
+
+    print(f"Indexed {len(passages)} transcript passages for {metadata['episode_title']}")
+
 # Add the podcast metadata and transcript to the ChromaDB collection
 def add_podcast_to_db_chroma(metadata, mp3_url, transcript_name, transcript_text):
     global podcast_collection
@@ -751,99 +1010,518 @@ def add_podcast_to_db_chroma(metadata, mp3_url, transcript_name, transcript_text
     transcript_github_url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/main/transcribed/{normalize_folder_name(metadata['podcast_name'])}/{transcript_name}"
     metadata['transcript_url'] = transcript_github_url  # Add transcript URL to metadata
 
-    document = f"{metadata['podcast_name']} - {metadata['episode_title']}\nTranscript: {transcript_text}"
+    # The full transcript is indexed as passages; the episode document only holds the title and opening
+    add_passages_to_db_chroma(metadata, transcript_text)
+    metadata['passages_indexed'] = True
+    opening = transcript_text[:PASSAGE_CHUNK_CHARS]
+    document = f"{metadata['podcast_name']} - {metadata['episode_title']}\nTranscript: {opening}"
 
     podcast_collection.upsert(
-        documents=[document],  # Add the text of the transcript with additional metadata as a document
+        documents=[document],  # Add the title and opening of the transcript as a document
         ids=[metadata['guid']],  # Use the GUID as the document ID
         metadatas=[metadata]  # Store the entire metadata dictionary
     )
+    write_collection_version()
 
     print(f"Data committed to ChromaDB with transcript URL: {transcript_github_url}")
 
-# Generate the HTML file from the ChromaDB collection
-def generate_html_from_chroma_db(history_file):
+# Path of the transcript file of an episode in TRANSCRIBED_FOLDER
+def transcript_path_for(metadata):
+    """Return the local path of the transcript of an episode."""
+    return os.path.join(TRANSCRIBED_FOLDER, normalize_folder_name(metadata.get("podcast_name", "")),
+                        f"{normalize_folder_name(metadata.get('episode_title', ''))}.txt")
+
+# Read a transcript file without the title and link lines added by finalize_transcript
+def read_transcript_text(transcript_path):
+    """Return the transcript text stored in a transcript file."""
+    with open(transcript_path, "r") as f:
+        content = f.read()
+    parts = content.split("\n\n", 1)
+    return parts[1] if len(parts) == 2 else content
+
+# Index passages for episodes that were stored before transcripts were split into passages
+def index_missing_passages():
+    """Add passages for every episode whose metadata is not marked as passages_indexed."""
     global podcast_collection
+    # Episodes whose transcript file was missing when they were last looked at
+    unavailable = set(load_state_file(PASSAGE_BACKFILL_FILE).get("unavailable", []))
+    backfilled = (podcast_collection.metadata or {}).get("passages_backfilled")
+    if backfilled and not unavailable:
+        return
+    # Once every episode was scanned, only those still waiting for their transcript are looked at again
+    results = podcast_collection.get(ids=sorted(unavailable), include=["metadatas"]) if backfilled \
+        else podcast_collection.get(include=["metadatas"])
+    missing = [(guid, metadata) for guid, metadata in zip(results['ids'], results['metadatas'])
+               if not metadata.get('passages_indexed')]
+
+    available = []
+    still_unavailable = set()
+    for guid, metadata in missing:
+        transcript_path = transcript_path_for(metadata)
+        if os.path.exists(transcript_path):
+            available.append((guid, metadata, transcript_path))
+        else:
+            if guid not in unavailable:
+                print(f"Transcript not found for {guid}: {transcript_path}")
+            still_unavailable.add(guid)
+
+    if available:
+        print(f"Indexing transcript passages for {len(available)} earlier episodes.")
+        for guid, metadata, transcript_path in available:
+            metadata['guid'] = guid
+            add_passages_to_db_chroma(metadata, read_transcript_text(transcript_path))
+            metadata['passages_indexed'] = True
+            podcast_collection.update(ids=[guid], metadatas=[metadata])
+        write_collection_version()
+
+    if still_unavailable != unavailable:
+        save_state_file(PASSAGE_BACKFILL_FILE, {"unavailable": sorted(still_unavailable)})
+    # The flag is stored with the collection, so a database replaced by an older copy is scanned again
+    if not backfilled:
+        podcast_collection.modify(metadata={**(podcast_collection.metadata or {}), "passages_backfilled": True})
+
+# Split a search query into lowercase words
+def tokenize_search_query(query):
+    """Return the distinct words of a query in the order they appear."""
+    return list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+
+# Open the local keyword index over the transcripts, creating it on first use
+def open_search_index(index_file=SEARCH_INDEX_FILE):
+    """Return a connection to the SQLite FTS5 index, which ranks matches with BM25."""
+    os.makedirs(os.path.dirname(index_file), exist_ok=True)
+    conn = sqlite3.connect(index_file)
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5(path UNINDEXED, body, tokenize='porter unicode61')")
+    conn.execute("CREATE TABLE IF NOT EXISTS indexed_files (path TEXT PRIMARY KEY, doc_id INTEGER, size INTEGER, mtime_ns INTEGER)")
+    return conn
+
+# Bring the keyword index in line with the transcript files on disk
+def update_search_index(conn, transcribed_folder=TRANSCRIBED_FOLDER):
+    """Index new or changed transcripts and drop removed ones, leaving unchanged files untouched."""
+    indexed = {path: (doc_id, size, mtime_ns) for path, doc_id, size, mtime_ns in
+               conn.execute("SELECT path, doc_id, size, mtime_ns FROM indexed_files")}
+    seen = set()
+    added = removed = 0
+    with conn:
+        for root, _, files in os.walk(transcribed_folder):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, transcribed_folder).replace(os.sep, "/")
+                seen.add(path)
+                stat = os.stat(full_path)
+                previous = indexed.get(path)
+                if previous and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                if previous:
+                    conn.execute("DELETE FROM transcripts WHERE rowid = ?", (previous[0],))
+                doc_id = conn.execute("INSERT INTO transcripts (path, body) VALUES (?, ?)",
+                                      (path, read_transcript_text(full_path))).lastrowid
+                conn.execute("INSERT OR REPLACE INTO indexed_files VALUES (?, ?, ?, ?)",
+                             (path, doc_id, stat.st_size, stat.st_mtime_ns))
+                added += 1
+        for path in indexed.keys() - seen:
+            conn.execute("DELETE FROM transcripts WHERE rowid = ?", (indexed[path][0],))
+            conn.execute("DELETE FROM indexed_files WHERE path = ?", (path,))
+            removed += 1
+    if added or removed:
+        print(f"Search index updated: {added} transcripts indexed, {removed} removed.")
+
+# Find the transcripts that best match the query words with BM25
+def keyword_search(conn, query, k=10):
+    """Return up to k (transcript path, highlighted snippet HTML) pairs, best match first."""
+    terms = tokenize_search_query(query)
+    if not terms:
+        return []
+    match = " OR ".join(f'"{term}"' for term in terms)
+    rows = conn.execute(
+        "SELECT path, snippet(transcripts, 1, char(2), char(3), '…', ?) FROM transcripts "
+        "WHERE transcripts MATCH ? ORDER BY rank LIMIT ?",
+        (SEARCH_SNIPPET_TOKENS, match, k)
+    ).fetchall()
+    # Escape the transcript text first, then turn the match markers into <mark> tags
+    return [(path, html.escape(snippet).replace("\x02", "<mark>").replace("\x03", "</mark>"))
+            for path, snippet in rows]
+
+# Highlight the query words in a passage returned by the vector search
+def highlight_passage(text, terms):
+    """Return HTML for about SEARCH_SNIPPET_CHARS characters of text around the first query word."""
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\w*", re.IGNORECASE) if terms else None
+    first = pattern.search(text) if pattern else None
+    start = max(0, first.start() - SEARCH_SNIPPET_CHARS // 3) if first else 0
+    window = text[start:start + SEARCH_SNIPPET_CHARS]
+    parts = ["…" if start else ""]
+    position = 0
+    for match in (pattern.finditer(window) if pattern else []):
+        parts.append(html.escape(window[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(window[position:]))
+    if start + SEARCH_SNIPPET_CHARS < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+# Map transcript paths relative to TRANSCRIBED_FOLDER to episode GUIDs
+def get_transcript_guids(podcast_collection):
+    """Return a dictionary from transcript path to GUID, built from the episode metadata only."""
+    results = podcast_collection.get(include=["metadatas"])
+    return {
+        f"{normalize_folder_name(metadata.get('podcast_name', ''))}/{normalize_folder_name(metadata.get('episode_title', ''))}.txt": guid
+        for guid, metadata in zip(results['ids'], results['metadatas']) if metadata
+    }
+
+# Return the embedding function the collections use by default, for embedding search queries
+def get_query_embedder():
+    """Return ChromaDB's default embedding function so queries and documents share one model."""
+    from chromadb.utils import embedding_functions
+    return embedding_functions.DefaultEmbeddingFunction()
+
+# Rank episodes by fusing the vector results with the keyword results
+def search_transcripts(query, podcast_collection, passage_collection, search_conn, transcript_guids, embed, k=10):
+    """Return up to k episode entries for the query, each with a highlighted snippet and a score."""
+    if not query.strip():
+        return []
+    terms = tokenize_search_query(query)
+
+    # Embed the query once and reuse the vector for both collections
+    query_embedding = embed([query])[0]
+    ranked_lists = []
+    snippets = {}
+
+    keyword_guids = []
+    for path, snippet in keyword_search(search_conn, query, k * 2):
+        guid = transcript_guids.get(path)
+        if guid:
+            keyword_guids.append(guid)
+            snippets.setdefault(guid, snippet)
+    ranked_lists.append(keyword_guids)
+
+    # Several passages of one episode can match, so ask for more and keep the best one per episode
+    passage_count = passage_collection.count()
+    if passage_count:
+        results = passage_collection.query(query_embeddings=[query_embedding], n_results=min(k * 3, passage_count),
+                                           include=["documents", "metadatas"])
+        passage_guids = []
+        for document, metadata in zip(results['documents'][0], results['metadatas'][0]):
+            guid = metadata.get("guid")
+            if guid and guid not in passage_guids:
+                passage_guids.append(guid)
+                snippets.setdefault(guid, highlight_passage(document, terms))
+        ranked_lists.append(passage_guids)
+
+    episode_count = podcast_collection.count()
+    if episode_count:
+        results = podcast_collection.query(query_embeddings=[query_embedding], n_results=min(k, episode_count),
+                                           include=["distances"])
+        ranked_lists.append(results['ids'][0])
+
+    # Reciprocal rank fusion: an episode scores 1 / (SEARCH_RRF_K + rank) in each list it appears in
+    scores = {}
+    for ranked in ranked_lists:
+        for rank, guid in enumerate(ranked, start=1):
+            scores[guid] = scores.get(guid, 0.0) + 1.0 / (SEARCH_RRF_K + rank)
+    top_guids = sorted(scores, key=scores.get, reverse=True)[:k]
+    if not top_guids:
+        return []
+
+    results = podcast_collection.get(ids=top_guids, include=["metadatas"])
+    metadatas = dict(zip(results['ids'], results['metadatas']))
+    entries = []
+    for guid in top_guids:
+        if guid not in metadatas:
+            continue
+        entry = build_podcast_entry(guid, metadatas[guid] or {})
+        entry["snippet"] = snippets.get(guid, "")
+        entry["score"] = round(scores[guid], 6)
+        entries.append(entry)
+    return entries
+
+# Load the GUIDs already rendered into the history file by the previous run
+def load_history_manifest(history_file):
+    """Return the rendered GUIDs, or None if the manifest is missing or the file changed since it was written."""
+    manifest = load_state_file(HISTORY_MANIFEST_FILE).get(os.path.abspath(history_file))
+    if not manifest or manifest.get("layout") != HISTORY_LAYOUT_VERSION or not os.path.exists(history_file):
+        return None
+    stat = os.stat(history_file)
+    if [stat.st_size, stat.st_mtime_ns] != [manifest.get("size"), manifest.get("mtime_ns")]:
+        return None
+    return manifest.get("guids")
+
+# Remember which GUIDs the history file holds so the next run only adds new rows
+def save_history_manifest(history_file, guids):
+    """Store the rendered GUIDs together with the size and mtime of the history file."""
+    state = load_state_file(HISTORY_MANIFEST_FILE)
+    stat = os.stat(history_file)
+    state[os.path.abspath(history_file)] = {"guids": guids, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                            "layout": HISTORY_LAYOUT_VERSION}
+    save_state_file(HISTORY_MANIFEST_FILE, state)
+
+# Write a generated file in one go, replacing the old one atomically
+def write_file_atomically(path, content):
+    """Atomically replace the file at path with content."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+# Return the Jinja2 environment used for all HTML, creating it on first use
+def get_template_environment():
+    """Return the shared environment; compiled templates are kept in memory and their bytecode on disk."""
+    global template_environment
+    with template_environment_lock:
+        if template_environment is None:
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+            environment = Environment(
+                loader=FileSystemLoader(TEMPLATES_DIR),
+                bytecode_cache=FileSystemBytecodeCache(TEMPLATE_CACHE_DIR),
+                autoescape=select_autoescape(["html"])
+            )
+            environment.filters["iso_date"] = iso_listen_date
+            environment.filters["short_date"] = short_listen_date
+            template_environment = environment
+        return template_environment
+
+# Render a template straight into a file, replacing the old one atomically
+def write_template_atomically(path, template_name, context):
+    """Stream the rendered template into a temporary file and move it into place."""
+    template = get_template_environment().get_template(template_name)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.writelines(template.generate(context))
+    os.replace(temp_path, path)
+
+# Generate the HTML file from the ChromaDB collection, adding only rows that are not in it yet
+def generate_html_from_chroma_db(history_file):
     """Generate HTML file from ChromaDB collection."""
+    global podcast_collection
     print(f"Generating HTML from ChromaDB")
-    
-    # Start the HTML log (this will overwrite any existing content)
-    start_html_log(history_file)
-    
-    # Retrieve all documents in the collection
-    results = podcast_collection.get()
 
-    if 'documents' in results and len(results['documents']) > 0:
-        documents = results['documents']
-        ids = results['ids']
-        metadatas = results.get('metadatas', [])
-    else:
+    # Only the metadata is rendered, so the transcript documents are never loaded
+    results = podcast_collection.get(include=["metadatas"])
+    ids = results['ids']
+    if not ids:
         print("No documents found in ChromaDB.")
         return
 
-    print(f"Found {len(documents)} podcast entries in ChromaDB.")
-    
-    for document, guid, metadata in zip(documents, ids, metadatas):
-        # Extract metadata from the document
-        podcast_name = metadata.get("podcast_name", "Unknown Podcast")
-        episode_title = metadata.get("episode_title", "Unknown Episode")
-        listen_date = metadata.get("listenDate", "Unknown Date")
-        
-        print(f"Adding podcast entry to HTML: Podcast={podcast_name}, Episode={episode_title}, GUID={guid}")
-        save_downloaded_url(history_file, metadata, transcript_name=f"{normalize_folder_name(episode_title)}.txt")
-    
-    # End the HTML log properly
-    end_html_log(history_file)
+    print(f"Found {len(ids)} podcast entries in ChromaDB.")
+    entries = [build_podcast_entry(guid, metadata or {}) for guid, metadata in zip(ids, results['metadatas'])]
+
+    # Splice the new rows in front of the marker when the file still matches the manifest and nothing was removed
+    rendered = load_history_manifest(history_file)
+    if rendered is not None and set(rendered) <= set(ids):
+        rendered_set = set(rendered)
+        new_entries = [entry for entry in entries if entry["guid"] not in rendered_set]
+        if not new_entries:
+            print(f"HTML already up to date: {history_file}")
+            return
+        with open(history_file, "r") as f:
+            content = f.read()
+        marker_position = content.rfind(HISTORY_ROWS_END_MARKER)
+        if marker_position != -1:
+            # history.html renders the same rows template right before the line holding the marker
+            marker_position = content.rfind("\n", 0, marker_position) + 1
+            rows = get_template_environment().get_template("history_rows.html").render(entries=new_entries)
+            write_file_atomically(history_file, content[:marker_position] + rows + content[marker_position:])
+            save_history_manifest(history_file, rendered + [entry["guid"] for entry in new_entries])
+            print(f"Added {len(new_entries)} podcast entries to HTML: {history_file}")
+            return
+
+    # Otherwise render the whole file
+    write_template_atomically(history_file, "history.html",
+                              {"entries": entries, "rows_end_marker": HISTORY_ROWS_END_MARKER})
+    save_history_manifest(history_file, [entry["guid"] for entry in entries])
     print(f"HTML generation complete: {history_file}")
 
+# Split a listen date as stored from the feed, or as YYYY-MM-DD in the archive data files, into its parts
+def listen_date_parts(listen_date):
+    """Return (year, month, day) of a listen date, or None if it cannot be parsed."""
+    # Split by hand: strptime is slow enough to dominate rendering large archives
+    if not isinstance(listen_date, str):
+        return None
+    parts = listen_date.split()
+    if len(parts) >= 4 and parts[2] in MONTH_NUMBERS and parts[1].isdigit() and parts[3].isdigit():
+        return int(parts[3]), MONTH_NUMBERS[parts[2]], int(parts[1])
+    parts = listen_date.split("-")
+    if len(parts) == 3 and all(part.isdigit() for part in parts):
+        return int(parts[0]), int(parts[1]), int(parts[2])
+    return None
+
+# Convert a listen date to YYYY-MM-DD so it sorts as text
+def iso_listen_date(listen_date):
+    """Return the listen date as YYYY-MM-DD, or an empty string if it cannot be parsed."""
+    parts = listen_date_parts(listen_date)
+    return f"{parts[0]:04d}-{parts[1]:02d}-{parts[2]:02d}" if parts else ""
+
+# Convert a listen date to MM/DD/YYYY for display
+def short_listen_date(listen_date):
+    """Return the listen date as MM/DD/YYYY, or unchanged if it cannot be parsed."""
+    parts = listen_date_parts(listen_date)
+    return f"{parts[1]:02d}/{parts[2]:02d}/{parts[0]:04d}" if parts else (listen_date or "")
+
+# Turn the metadata of an episode into one compact row of an archive data file
+def archive_record(guid, metadata):
+    """Return the values of ARCHIVE_FIELDS for an episode."""
+    podcast_name = metadata.get("podcast_name", "Unknown Podcast")
+    episode_title = metadata.get("episode_title", "Unknown Episode")
+    return [
+        podcast_name,
+        episode_title,
+        iso_listen_date(metadata.get("listenDate")),
+        f"{normalize_folder_name(podcast_name)}/{normalize_folder_name(episode_title)}.txt",
+        metadata.get("mp3_url", ""),
+        metadata.get("link", ""),
+        guid,
+    ]
+
+# Turn an archive record back into the entry rendered by the templates
+def archive_entry(record, transcript_base):
+    """Return the template entry for an archive record."""
+    podcast_name, episode_title, date, transcript, mp3_url, link, guid = record
+    return {
+        "podcast_name": podcast_name,
+        "episode_title": episode_title,
+        "listen_date": date,
+        "transcript_url": transcript_base + transcript,
+        "mp3_url": mp3_url,
+        "link": link,
+        "guid": guid
+    }
+
+# Pick the archive page an episode belongs on
+def archive_shard(record, shard_by):
+    """Return the (file name, label) of the shard for a record, by year or by podcast."""
+    if shard_by == "podcast":
+        return normalize_folder_name(record[0]) or "unknown", record[0]
+    year = record[2][:4] or "unknown"
+    return year, year.capitalize()
+
+# Write a generated file only if its content changed, so unchanged shards stay out of the next commit
+def write_file_if_changed(path, content):
+    """Write content to path atomically unless the file already holds it; return True if it was written."""
+    try:
+        with open(path, "r") as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    write_file_atomically(path, content)
+    return True
+
+# Write the archive as one page and data file per year or podcast, plus a compact JSON index
+def generate_static_archive(archive_folder=STATIC_ARCHIVE_FOLDER, shard_by=STATIC_ARCHIVE_SHARD_BY):
+    """Generate the sharded static archive from the episode metadata in ChromaDB."""
+    global podcast_collection
+    print(f"Generating sharded archive in {archive_folder}")
+    results = podcast_collection.get(include=["metadatas"])
+    transcript_base = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/main/transcribed/"
+
+    # Group the records by shard, newest first within each shard
+    grouped = {}
+    for guid, metadata in zip(results['ids'], results['metadatas']):
+        record = archive_record(guid, metadata or {})
+        key, label = archive_shard(record, shard_by)
+        grouped.setdefault(key, (label, []))[1].append(record)
+    for _, records in grouped.values():
+        records.sort(key=lambda record: record[2], reverse=True)
+
+    # Years are listed newest first, podcasts alphabetically
+    keys = sorted(grouped, reverse=True) if shard_by == "year" else sorted(grouped, key=lambda key: grouped[key][0].lower())
+    shards = [{"key": key, "label": grouped[key][0], "count": len(grouped[key][1]),
+               "page": f"{key}.html", "data": f"data/{key}.json"} for key in keys]
+
+    os.makedirs(os.path.join(archive_folder, "data"), exist_ok=True)
+    index_file = os.path.join(archive_folder, "index.json")
+    previous_shards = load_state_file(index_file).get("shards", [])
+
+    environment = get_template_environment()
+    shard_template = environment.get_template("archive_shard.html")
+    written = 0
+    for shard in shards:
+        records = grouped[shard["key"]][1]
+        data = json.dumps({"fields": ARCHIVE_FIELDS, "rows": records}, separators=(",", ":"))
+        written += write_file_if_changed(os.path.join(archive_folder, shard["data"]), data)
+        # The newest rows are written into the page itself; archive.js loads the rest from the data file
+        first_entries = [archive_entry(record, transcript_base) for record in records[:STATIC_ARCHIVE_FIRST_ROWS]]
+        written += write_file_if_changed(os.path.join(archive_folder, shard["page"]), shard_template.render(
+            shard=shard, shards=shards, entries=first_entries, transcript_base=transcript_base))
+
+    # Remove the pages of shards that no longer exist, such as after switching STATIC_ARCHIVE_SHARD_BY
+    current = {shard["key"] for shard in shards}
+    for shard in previous_shards:
+        if shard.get("key") not in current:
+            for name in (shard.get("page"), shard.get("data")):
+                if name and os.path.exists(os.path.join(archive_folder, name)):
+                    os.remove(os.path.join(archive_folder, name))
+
+    index = {"shard_by": shard_by, "fields": ARCHIVE_FIELDS, "transcript_base": transcript_base,
+             "episodes": len(results['ids']), "shards": shards}
+    written += write_file_if_changed(index_file, json.dumps(index, separators=(",", ":")))
+    written += write_file_if_changed(os.path.join(archive_folder, "index.html"),
+                                     environment.get_template("archive_index.html").render(shards=shards))
+    written += write_file_if_changed(os.path.join(archive_folder, "archive.js"),
+                                     environment.get_template("archive.js").render(fields=ARCHIVE_FIELDS))
+    print(f"Sharded archive has {len(shards)} pages; {written} files updated.")
+
 # Generate SHA-256 hashes for all files in the ChromaDB directory and save them
 def generate_chroma_hashes(db_path, repo_root, hash_file):
-    """Generate SHA-256 hashes for all files in the ChromaDB directory and save them."""
-    hashes = []
+    """Generate SHA-256 hashes for all files in the ChromaDB directory, save them and return the bytes rehashed."""
+    # Hashes from earlier runs are reused for files whose size, mtime and inode did not change
+    cache = load_state_file(HASH_CACHE_FILE)
+    scan_started_ns = time.time_ns()
+    fingerprints = {}
+    hashes = {}
+    changed = []
     for root, dirs, files in os.walk(db_path):
         for file in files:
             file_path = os.path.join(root, file)
             # Generate a path relative to the repository root
             file_rel_path = os.path.relpath(file_path, repo_root).replace('\\', '/')
-            file_hash_value = file_hash(file_path)
-            hashes.append(f"{file_rel_path}:{file_hash_value}")
+            stat = os.stat(file_path)
+            fingerprint = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+            fingerprints[file_rel_path] = fingerprint
+            cached = cache.get(file_rel_path)
+            if cached and cached[:3] == fingerprint:
+                hashes[file_rel_path] = cached[3]
+            else:
+                changed.append((file_rel_path, file_path))
+
+    # Hash the changed files, several at a time when there is more than one
+    if len(changed) > 1:
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+            changed_hashes = list(executor.map(file_hash, [file_path for _, file_path in changed]))
+    else:
+        changed_hashes = [file_hash(file_path) for _, file_path in changed]
+    for (file_rel_path, _), file_hash_value in zip(changed, changed_hashes):
+        hashes[file_rel_path] = file_hash_value
+
     # Sort the hashes to ensure consistent order
-    hashes.sort()
+    lines = sorted(f"{file_rel_path}:{file_hash_value}" for file_rel_path, file_hash_value in hashes.items())
     with open(hash_file, 'w', newline='\n') as f:
-        f.write("\n".join(hashes))
-    print(f"ChromaDB hashes generated and saved to {hash_file}.")
-
-# Compare local and remote hash files to determine if pulling is necessary
-def compare_chroma_hashes(local_hash_file, remote_hash_file):
-    """Compare local and remote hash files to determine if pulling is necessary."""
-    with open(local_hash_file, 'r') as f:
-        local_hashes = set(line.strip() for line in f)
-    with open(remote_hash_file, 'r') as f:
-        remote_hashes = set(line.strip() for line in f)
-    if local_hashes == remote_hashes:
-        print("Local ChromaDB files are up-to-date.")
-        return True
-    else:
-        print("Local ChromaDB files differ from remote.")
-        # Debugging: Print the differences
-        print("Differences:")
-        print("In local but not in remote:")
-        for line in local_hashes - remote_hashes:
-            print(line)
-        print("In remote but not in local:")
-        for line in remote_hashes - local_hashes:
-            print(line)
-        return False
+        f.write("\n".join(lines))
+
+    # Do not trust fingerprints of files written just before the scan; a write in the same instant may not change them
+    save_state_file(HASH_CACHE_FILE, {
+        file_rel_path: fingerprint + [hashes[file_rel_path]]
+        for file_rel_path, fingerprint in fingerprints.items()
+        if fingerprint[1] < scan_started_ns - HASH_RACY_WINDOW_NS
+    })
+    print(f"ChromaDB hashes generated and saved to {hash_file} ({len(changed)} of {len(hashes)} files rehashed).")
+    return sum(fingerprints[file_rel_path][0] for file_rel_path, _ in changed)
+
+# Compute the object ID git gives a file's contents, without running git
+def git_blob_oid(filepath, object_format="sha1"):
+    """Return the hex blob OID of the file for the given object format (sha1 or sha256)."""
+    with open(filepath, 'rb') as f:
+        content = f.read()
+    digest = hashlib.new(object_format)
+    digest.update(b"blob %d\0" % len(content))
+    digest.update(content)
+    return digest.hexdigest()
 
-# Pull the latest ChromaDB files from the GitHub repository and sync the local database
+# Pull the latest ChromaDB files from the already fetched remote branch into the local database
 def check_and_sync_chromadb(repo_name, db_path, remote_db_dir):
-    """Pull the latest ChromaDB files from the GitHub repository and sync the local database."""
+    """Check out the ChromaDB files of origin/main, which the caller has just fetched."""
     print("Syncing ChromaDB from remote repository...")
-    # Pull the latest database files from GitHub
-    if not run_git_command(["git", "fetch", "origin"], cwd=REPO_ROOT):
-        print("Failed to fetch from remote repository.")
-        return False
-
     # Reset the local database directory to match the remote
     if not run_git_command(["git", "checkout", f"origin/main", "--", remote_db_dir], cwd=REPO_ROOT):
         print("Failed to checkout database directory from remote repository.")
@@ -852,31 +1530,856 @@ def check_and_sync_chromadb(repo_name, db_path, remote_db_dir):
     print("ChromaDB files synced from remote repository.")
     return True
 
-# Check if sync is necessary by comparing local and remote hashes
+# Check if sync is necessary by comparing the local hash file with the one on the fetched remote branch
 def pull_and_sync_chromadb_if_necessary(repo_name, db_path, hash_file, remote_db_dir):
     """Check if sync is necessary by comparing local and remote hashes."""
-    remote_hash_file = os.path.join(REPO_ROOT, 'remote_chroma_hashes.txt')
+    # One fetch serves both the comparison and the checkout; the remote hash file is read from the fetched ref
+    if not run_git_command(["git", "fetch", "origin"], cwd=REPO_ROOT):
+        print("Failed to fetch from remote repository.")
+        return
 
-    # Check if the remote hash file exists
-    try:
-        pull_github_file(repo_name, os.path.basename(hash_file), remote_hash_file)
-    except requests.exceptions.HTTPError as e:
-        if e.response.status_code == 404:
-            print(f"Remote hash file does not exist. Skipping sync.")
-            return
-        else:
-            raise  # Re-raise the error if it's not a 404
+    remote_hash_path = os.path.relpath(hash_file, REPO_ROOT).replace('\\', '/')
+    result = run_git(["git", "rev-parse", "--verify", "--quiet", f"origin/main:{remote_hash_path}"], REPO_ROOT)
+    if result.returncode != 0:
+        print(f"Remote hash file does not exist. Skipping sync.")
+        return
 
-    # If the file was found, proceed with the comparison
-    if compare_chroma_hashes(hash_file, remote_hash_file):
+    # The hash file lists every database file with its hash, so equal blobs mean equal databases
+    remote_oid = result.stdout.strip()
+    local_oid = git_blob_oid(hash_file, "sha256" if len(remote_oid) == 64 else "sha1")
+    if local_oid == remote_oid:
+        print("Local ChromaDB files are up-to-date.")
         print("No sync needed.")
     else:
+        print(f"Local ChromaDB files differ from remote (hash file blob {local_oid[:12]} locally, {remote_oid[:12]} on origin/main).")
         check_and_sync_chromadb(repo_name, db_path, remote_db_dir)
 
-    os.remove(remote_hash_file)  # Clean up the temporary remote hash file
+# Pack an embedding as base64 float32 so delta files stay small
+def encode_embedding(embedding):
+    """Return the embedding as a base64 string of little-endian float32 values."""
+    return base64.b64encode(struct.pack(f"<{len(embedding)}f", *embedding)).decode("ascii")
+
+# Unpack an embedding written by encode_embedding
+def decode_embedding(encoded):
+    """Return the embedding stored in a base64 float32 string as a list of floats."""
+    data = base64.b64decode(encoded)
+    return list(struct.unpack(f"<{len(data) // 4}f", data))
+
+# Load which delta files were applied to, and which episodes were exported from, the local database
+def load_sync_state(db_path=CHROMADB_DB_PATH):
+    """Return the sync state stored next to the ChromaDB files."""
+    state = load_state_file(os.path.join(db_path, SYNC_STATE_FILE))
+    return {"applied": state.get("applied", []), "exported": state.get("exported", [])}
+
+# Save the sync state next to the ChromaDB files, so it is wiped together with the database
+def save_sync_state(state, db_path=CHROMADB_DB_PATH):
+    """Atomically write the sync state."""
+    state = {"applied": list(dict.fromkeys(state["applied"])), "exported": list(dict.fromkeys(state["exported"]))}
+    save_state_file(os.path.join(db_path, SYNC_STATE_FILE), state)
+
+# List the delta files in the order they were written
+def list_sync_deltas(sync_folder=SYNC_FOLDER):
+    """Return the names of the delta files, oldest first."""
+    deltas_folder = os.path.join(sync_folder, "deltas")
+    if not os.path.isdir(deltas_folder):
+        return []
+    return sorted(name for name in os.listdir(deltas_folder) if name.endswith(".jsonl.gz"))
+
+# Yield the episode records of a delta file
+def read_sync_delta(path):
+    """Yield one dictionary per episode line of a gzip-compressed JSONL delta file."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+# Build the record stored in a delta file for each episode
+def build_sync_records(guids, episodes, passages, include_embeddings):
+    """Yield delta records with metadata, document and transcript, plus embeddings if requested."""
+    include = ["metadatas", "documents"] + (["embeddings"] if include_embeddings else [])
+    for batch_start in range(0, len(guids), SYNC_EXPORT_BATCH_SIZE):
+        results = episodes.get(ids=guids[batch_start:batch_start + SYNC_EXPORT_BATCH_SIZE], include=include)
+        for i, guid in enumerate(results['ids']):
+            metadata = results['metadatas'][i] or {}
+            transcript_path = transcript_path_for(metadata)
+            record = {
+                "guid": guid,
+                "metadata": metadata,
+                "document": results['documents'][i],
+                "transcript": read_transcript_text(transcript_path) if os.path.exists(transcript_path) else None,
+            }
+            if include_embeddings:
+                record["embedding"] = encode_embedding(results['embeddings'][i])
+                passage_results = passages.get(where={"guid": guid}, include=["metadatas", "documents", "embeddings"])
+                record["passages"] = [
+                    {"id": passage_id, "document": document, "metadata": passage_metadata,
+                     "embedding": encode_embedding(embedding)}
+                    for passage_id, document, passage_metadata, embedding in zip(
+                        passage_results['ids'], passage_results['documents'],
+                        passage_results['metadatas'], passage_results['embeddings'])
+                ]
+            yield record
+
+# Write the episodes not exported yet to a new delta file
+def export_sync_delta(episodes, passages, sync_folder=SYNC_FOLDER, db_path=CHROMADB_DB_PATH,
+                      include_embeddings=SYNC_INCLUDE_EMBEDDINGS):
+    """Append one compressed delta with every episode missing from earlier deltas; return its path or None."""
+    state = load_sync_state(db_path)
+    exported = set(state["exported"])
+    new_guids = [guid for guid in episodes.get(include=[])['ids'] if guid not in exported]
+    if not new_guids:
+        print("No new episodes to export to the sync folder.")
+        return None
+
+    # Timestamped names sort in the order deltas were written; the random part keeps names from two machines apart
+    deltas_folder = os.path.join(sync_folder, "deltas")
+    os.makedirs(deltas_folder, exist_ok=True)
+    now_ns = time.time_ns()
+    name = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime(now_ns // 10**9))}{now_ns % 10**9:09d}-{generate_random_string()}.jsonl.gz"
+    delta_path = os.path.join(deltas_folder, name)
+    temp_path = f"{delta_path}.tmp"
+    with open(temp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        for record in build_sync_records(new_guids, episodes, passages, include_embeddings):
+            f.write((json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8"))
+    os.replace(temp_path, delta_path)
+
+    state["exported"] = state["exported"] + new_guids
+    state["applied"] = state["applied"] + [name]
+    save_sync_state(state, db_path)
+    print(f"Exported {len(new_guids)} episodes to {delta_path}")
+    return delta_path
+
+# Apply the delta files that this database has not seen yet
+def import_sync_deltas(episodes, passages, sync_folder=SYNC_FOLDER, db_path=CHROMADB_DB_PATH, rebuild=False):
+    """Upsert the episodes of every unapplied delta into ChromaDB; with rebuild, start from empty collections."""
+    state = load_sync_state(db_path)
+    if rebuild:
+        for collection in (episodes, passages):
+            existing = collection.get(include=[])['ids']
+            for batch_start in range(0, len(existing), 5000):
+                collection.delete(ids=existing[batch_start:batch_start + 5000])
+        state = {"applied": [], "exported": []}
+
+    applied = set(state["applied"])
+    pending = [name for name in list_sync_deltas(sync_folder) if name not in applied]
+    if not pending:
+        print("ChromaDB is up to date with the sync folder.")
+        return 0
+
+    imported = 0
+    for name in pending:
+        for record in read_sync_delta(os.path.join(sync_folder, "deltas", name)):
+            metadata = dict(record["metadata"], guid=record["guid"])
+            if "embedding" in record:
+                episodes.upsert(ids=[record["guid"]], documents=[record["document"]], metadatas=[metadata],
+                                embeddings=[decode_embedding(record["embedding"])])
+            else:
+                episodes.upsert(ids=[record["guid"]], documents=[record["document"]], metadatas=[metadata])
+
+            # Use the stored passage embeddings when the delta has them, otherwise embed the transcript again
+            if record.get("passages"):
+                passages.delete(where={"guid": record["guid"]})
+                for batch_start in range(0, len(record["passages"]), PASSAGE_BATCH_SIZE):
+                    batch = record["passages"][batch_start:batch_start + PASSAGE_BATCH_SIZE]
+                    passages.upsert(ids=[passage["id"] for passage in batch],
+                                    documents=[passage["document"] for passage in batch],
+                                    metadatas=[passage["metadata"] for passage in batch],
+                                    embeddings=[decode_embedding(passage["embedding"]) for passage in batch])
+            elif record.get("transcript"):
+                add_passages_to_db_chroma(metadata, record["transcript"], collection=passages)
+            state["exported"].append(record["guid"])
+            imported += 1
+        state["applied"].append(name)
+        # Save after every delta so an interrupted import resumes where it stopped
+        save_sync_state(state, db_path)
+
+    write_collection_version(db_path)
+    print(f"Imported {imported} episodes from {len(pending)} delta files.")
+    return imported
+
+# Bring in the delta files pushed by other machines and apply them
+def pull_and_import_sync_deltas():
+    """Check out the remote sync folder next to the local one and import the deltas that are new."""
+    global podcast_collection, passage_collection
+    sync_dir = os.path.relpath(SYNC_FOLDER, REPO_ROOT)
+    if run_git_command(["git", "fetch", "origin"], cwd=REPO_ROOT):
+        # Deltas are only ever added, so checking out the remote folder never loses local files
+        result = run_git(["git", "cat-file", "-e", f"origin/main:{sync_dir}"], REPO_ROOT)
+        if result.returncode == 0:
+            run_git_command(["git", "checkout", "origin/main", "--", sync_dir], cwd=REPO_ROOT)
+    else:
+        print("Failed to fetch from remote repository; importing local deltas only.")
+    import_sync_deltas(podcast_collection, passage_collection)
+
+# Move the local repository to what origin/main holds at the end of a run
+def reset_to_remote(repo_root):
+    """Fetch origin again and hard-reset to origin/main, returning whether the reset happened."""
+    if not run_git_command(["git", "fetch", "origin"], cwd=repo_root):
+        return False
+    # Check if origin/main exists before resetting
+    if run_git(["git", "rev-parse", "--verify", "--quiet", "origin/main"], repo_root).returncode != 0:
+        print("origin/main does not exist. Skipping git reset.")
+        return False
+    return run_git_command(["git", "reset", "--hard", "origin/main"], cwd=repo_root)
+
+# Download the RSS feed with the pooled httpx client when check_feed_for_changes did not already read it
+def fetch_feed_chunks(feed_url):
+    """Download the RSS feed and yield its content in chunks."""
+    response, spool = run_async(request_feed_async(feed_url, {}))
+    response.raise_for_status()
+    return read_feed_spool(spool)
+
+# Read a JSON state file from PODSCRIBER_STATE_DIR
+def load_state_file(path):
+    """Load a JSON state file, returning an empty dict if it is missing or unreadable."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+# Write a JSON state file atomically so an interrupted run never leaves it half written
+def save_state_file(path, state):
+    """Atomically write a JSON state file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+# Time a stage of the run, or of one episode, and keep the result for the run report
+@contextlib.contextmanager
+def span(stage, episode=None, **fields):
+    """Record how long the block takes; byte counts and other numbers can be set on the yielded dict."""
+    record = {"stage": stage, **fields}
+    if episode is not None:
+        record["episode"] = episode
+    start = time.perf_counter()
+    record["offset"] = round(time.time() - run_started_at, 3)
+    try:
+        yield record
+    except BaseException:
+        record["ok"] = False
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        if record.get("audio_seconds"):
+            record["realtime_factor"] = round(record["seconds"] / record["audio_seconds"], 3)
+        with run_spans_lock:
+            run_spans.append(record)
+
+# Keep a span whose duration was measured elsewhere, such as an episode passing through all stages
+def record_span(stage, seconds, episode=None, **fields):
+    """Add a finished span of the given length to the run report."""
+    record = {"stage": stage, **fields}
+    if episode is not None:
+        record["episode"] = episode
+    record["offset"] = round(time.time() - run_started_at - seconds, 3)
+    record["seconds"] = round(seconds, 3)
+    with run_spans_lock:
+        run_spans.append(record)
+
+# Add up the spans of each stage
+def summarize_spans(spans):
+    """Return per-stage totals: count, failures, seconds, slowest span and bytes."""
+    stages = {}
+    for record in spans:
+        stage = stages.setdefault(record["stage"], {"count": 0, "failed": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0})
+        stage["count"] += 1
+        stage["failed"] += record.get("ok") is False
+        stage["seconds"] = round(stage["seconds"] + record["seconds"], 3)
+        stage["max_seconds"] = max(stage["max_seconds"], record["seconds"])
+        stage["bytes"] += record.get("bytes", 0)
+    # Whisper speed over the whole run: seconds spent per second of audio, below 1 is faster than realtime
+    whisper = [record for record in spans
+               if record["stage"] == "whisper" and record.get("audio_seconds") and record.get("ok") is not False]
+    if whisper:
+        audio_seconds = sum(record["audio_seconds"] for record in whisper)
+        stages["whisper"]["audio_seconds"] = round(audio_seconds, 1)
+        stages["whisper"]["realtime_factor"] = round(sum(record["seconds"] for record in whisper) / audio_seconds, 3)
+    return stages
+
+# Build the report of this run from its spans
+def build_run_report():
+    """Return the run report: totals, per-stage summary and every span."""
+    with run_spans_lock:
+        spans = list(run_spans)
+    finished_at = time.time()
+    return {
+        "started_at": datetime.fromtimestamp(run_started_at).isoformat(timespec="seconds"),
+        "seconds": round(finished_at - run_started_at, 3),
+        "episodes": sum(record["stage"] == "episode" for record in spans),
+        "failed_episodes": len(failed_episodes),
+        "git_subprocesses": git_subprocess_count,
+        "stages": summarize_spans(spans),
+        "spans": spans,
+    }
+
+# Render the run report in the Prometheus text format
+def format_metrics(report):
+    """Return the run report as Prometheus gauges describing the last run."""
+    lines = [
+        "# HELP podscriber_last_run_seconds Wall time of the last podscriber run.",
+        "# TYPE podscriber_last_run_seconds gauge",
+        f"podscriber_last_run_seconds {report['seconds']}",
+        "# HELP podscriber_last_run_timestamp_seconds Unix time the last podscriber run started.",
+        "# TYPE podscriber_last_run_timestamp_seconds gauge",
+        f"podscriber_last_run_timestamp_seconds {round(run_started_at, 3)}",
+        "# HELP podscriber_last_run_episodes Episodes indexed and failed in the last run.",
+        "# TYPE podscriber_last_run_episodes gauge",
+        f'podscriber_last_run_episodes{{result="indexed"}} {report["episodes"]}',
+        f'podscriber_last_run_episodes{{result="failed"}} {report["failed_episodes"]}',
+    ]
+    for name, key, help_text in (
+        ("stage_seconds", "seconds", "Seconds spent in each stage in the last run, summed over episodes and workers."),
+        ("stage_spans", "count", "Number of times each stage ran in the last run."),
+        ("stage_failures", "failed", "Number of times each stage failed in the last run."),
+        ("stage_bytes", "bytes", "Bytes handled by each stage in the last run."),
+    ):
+        lines.append(f"# HELP podscriber_last_run_{name} {help_text}")
+        lines.append(f"# TYPE podscriber_last_run_{name} gauge")
+        for stage, totals in sorted(report["stages"].items()):
+            lines.append(f'podscriber_last_run_{name}{{stage="{stage}"}} {totals[key]}')
+    whisper = report["stages"].get("whisper", {})
+    if "realtime_factor" in whisper:
+        lines.append("# HELP podscriber_last_run_whisper_realtime_factor Whisper seconds per second of audio in the last run.")
+        lines.append("# TYPE podscriber_last_run_whisper_realtime_factor gauge")
+        lines.append(f"podscriber_last_run_whisper_realtime_factor {whisper['realtime_factor']}")
+    return "\n".join(lines) + "\n"
+
+# Write the run report, and the metrics file if one is configured, when the script exits
+def write_run_report():
+    """Save this run's report to RUN_REPORT_FOLDER, keep the newest RUN_REPORT_KEEP and print the stage totals."""
+    try:
+        report = build_run_report()
+        name = datetime.fromtimestamp(run_started_at).strftime("%Y%m%dT%H%M%S") + f"-{os.getpid()}.json"
+        save_state_file(os.path.join(RUN_REPORT_FOLDER, name), report)
+        for old_report in sorted(os.listdir(RUN_REPORT_FOLDER))[:-max(1, RUN_REPORT_KEEP)]:
+            os.remove(os.path.join(RUN_REPORT_FOLDER, old_report))
+        if METRICS_TEXTFILE:
+            write_file_atomically(METRICS_TEXTFILE, format_metrics(report))
+
+        print(f"Run finished in {report['seconds']:.1f} s; report saved to {os.path.join(RUN_REPORT_FOLDER, name)}")
+        for stage, totals in sorted(report["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"  {stage:<16} {totals['seconds']:9.1f} s  x{totals['count']:<4} {totals['bytes'] / 1048576:9.1f} MiB")
+    except Exception as e:
+        print(f"Failed to write the run report: {e}")
+
+# Load the cached ETag, Last-Modified and content hash of a feed
+def load_feed_state(feed_url):
+    """Return the cached validators of a feed from the previous successful run."""
+    feed_state = load_state_file(FEED_STATE_FILE).get(feed_url, {})
+    # The validators only mean "nothing to do" while the database they were saved with is still in place
+    if feed_state and (not os.path.isdir(REPO_ROOT) or not os.path.isdir(CHROMADB_DB_PATH)
+                       or feed_state.get("db_version") != read_collection_version(CHROMADB_DB_PATH)):
+        print("The local database changed since the feed was last processed; reading the whole feed.")
+        return {}
+    return feed_state
+
+# Save the ETag, Last-Modified and content hash of a feed for the next run
+def save_feed_state(feed_url, feed_state):
+    """Store the validators of a feed once its items were processed successfully."""
+    state = load_state_file(FEED_STATE_FILE)
+    state[feed_url] = {**feed_state, "db_version": read_collection_version(CHROMADB_DB_PATH)}
+    save_state_file(FEED_STATE_FILE, state)
+    print(f"Saved feed state to {FEED_STATE_FILE}.")
+
+# Copy a feed body into a temporary file as it arrives, so no connection sits idle until the parser starts
+async def spool_feed_body(response, spool):
+    """Write the response body to spool["file"] and hash it, then mark the spool done."""
+    sha256 = hashlib.sha256()
+    try:
+        async for chunk in response.aiter_bytes(FEED_CHUNK_SIZE):
+            sha256.update(chunk)
+            with spool["condition"]:
+                if spool["file"].closed:
+                    break
+                spool["file"].seek(0, os.SEEK_END)
+                spool["file"].write(chunk)
+                spool["size"] += len(chunk)
+                spool["condition"].notify_all()
+        else:
+            spool["sha256"] = sha256.hexdigest()
+    except Exception as e:
+        spool["error"] = e
+    finally:
+        await response.aclose()
+        with spool["condition"]:
+            spool["done"] = True
+            spool["condition"].notify_all()
+
+# Stop downloading a spooled feed body and drop what was kept of it
+def close_feed_spool(spool):
+    """Cancel the download of a spooled feed body and close its temporary file."""
+    get_async_loop().call_soon_threadsafe(spool["task"].cancel)
+    with spool["condition"]:
+        spool["file"].close()
+
+# Wait until a spooled feed body has been downloaded completely
+def wait_for_feed_spool(spool):
+    """Block until spool_feed_body finished and re-raise the error it failed with."""
+    with spool["condition"]:
+        while not spool["done"]:
+            spool["condition"].wait()
+    if spool["error"] is not None:
+        raise spool["error"]
+
+# Hand a spooled feed body to the incremental parser while it is still downloading
+def read_feed_spool(spool):
+    """Yield the feed body in chunks as they arrive; closing the generator stops the download."""
+    position = 0
+    try:
+        while True:
+            with spool["condition"]:
+                while spool["size"] <= position and not spool["done"]:
+                    spool["condition"].wait()
+                spool["file"].seek(position)
+                chunk = spool["file"].read(min(spool["size"] - position, FEED_CHUNK_SIZE))
+                done = spool["done"]
+            if chunk:
+                position += len(chunk)
+                yield chunk
+            elif done:
+                break
+        if spool["error"] is not None:
+            raise spool["error"]
+    finally:
+        close_feed_spool(spool)
+
+# Send a conditional GET for the RSS feed with the shared async client
+async def request_feed_async(feed_url, cached_state):
+    """Return (response, spool) for a conditional GET; the body is only downloaded when the validators changed."""
+    headers = {}
+    if cached_state.get("etag"):
+        headers["If-None-Match"] = cached_state["etag"]
+    if cached_state.get("last_modified"):
+        headers["If-Modified-Since"] = cached_state["last_modified"]
+
+    client = get_async_client()
+    response = await client.send(client.build_request("GET", feed_url, headers=headers), stream=True)
+    # Some servers ignore conditional requests but still send the same validators back
+    validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    unchanged = any(validators) and validators == (cached_state.get("etag"), cached_state.get("last_modified"))
+    if response.status_code != 200 or unchanged:
+        await response.aclose()
+        return response, None
+
+    # The body keeps downloading in the background; the temporary file keeps memory flat however long the feed is
+    spool = {"file": tempfile.TemporaryFile(), "condition": threading.Condition(), "size": 0,
+             "done": False, "error": None, "sha256": None}
+    spool["task"] = asyncio.get_running_loop().create_task(spool_feed_body(response, spool))
+    return response, spool
+
+# Fetch the RSS feed with a conditional GET and tell whether it changed since the last run
+def check_feed_for_changes(feed_url, prefetched=None):
+    """Return (changed, feed_chunks, feed_state) using ETag/Last-Modified and a content hash of the feed."""
+    cached_state = load_feed_state(feed_url)
+    # prefetched is the (response, spool) of a request already made by run_startup_checks
+    response, spool = prefetched or run_async(request_feed_async(feed_url, cached_state))
+    if response.status_code == 304:
+        print("RSS feed not modified since the last run (HTTP 304).")
+        return False, None, cached_state
+    response.raise_for_status()
+
+    feed_state = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+    # request_feed_async leaves the body unread when the same validators came back
+    if spool is None:
+        print("RSS feed validators unchanged since the last run.")
+        return False, None, cached_state
+
+    if not feed_state["etag"] and not feed_state["last_modified"]:
+        # Without validators the only way to tell is to download the whole body and compare hashes
+        try:
+            wait_for_feed_spool(spool)
+        except BaseException:
+            close_feed_spool(spool)
+            raise
+        feed_state["content_sha256"] = spool["sha256"]
+        if feed_state["content_sha256"] == cached_state.get("content_sha256"):
+            print("RSS feed content unchanged since the last run.")
+            close_feed_spool(spool)
+            return False, None, cached_state
+
+    # The parsed items come from this same response, so the stored validators always describe them
+    return True, read_feed_spool(spool), feed_state
+
+# Text of a child element of a feed item, or None if the child is missing
+def feed_item_text(item, tag):
+    """Return the text of the given child element of a feed item, or None if it is missing."""
+    child = item.find(tag)
+    return child.text if child is not None else None
+
+# Parse the RSS feed incrementally and yield the items that have not been processed yet
+def iter_feed_items(feed_chunks, is_known=None, max_items=None, debug=True):
+    """Yield new RSS feed items while the feed downloads and stop at the first run of already known GUIDs."""
+    parser = ET.XMLPullParser(events=("start", "end"))
+    open_elements = []
+    items_seen = 0
+    known_run = 0
+
+    try:
+        for chunk in feed_chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    open_elements.append(elem)
+                    continue
+                open_elements.pop()
+
+                # Only look at ./channel/item elements, exactly like root.findall('./channel/item')
+                if elem.tag != "item" or len(open_elements) != 2 or open_elements[-1].tag != "channel":
+                    continue
+
+                enclosure = elem.find("enclosure")
+                item = {
+                    "title": feed_item_text(elem, "title"),
+                    "pubDate": feed_item_text(elem, "pubDate"),
+                    "guid": feed_item_text(elem, "guid"),
+                    "link": feed_item_text(elem, "link"),
+                    "enclosure_url": enclosure.get("url") if enclosure is not None else None,
+                }
+
+                # Free the parsed item so memory stays flat however long the feed is
+                elem.clear()
+                open_elements[-1].remove(elem)
+
+                items_seen += 1
+                guid = item["guid"] or item["enclosure_url"]
+                if guid and is_known and is_known(guid):
+                    if debug:
+                        print(f"File already processed: {item['enclosure_url']}")
+                    known_run += 1
+                    if FEED_KNOWN_GUID_RUN and known_run >= FEED_KNOWN_GUID_RUN:
+                        print(f"Found {known_run} already processed episodes in a row. Stopping feed parsing.")
+                        return
+                else:
+                    known_run = 0
+                    yield item
+
+                if max_items is not None and items_seen >= max_items:
+                    return
+    finally:
+        # Stop downloading the rest of the feed when we terminate early
+        if hasattr(feed_chunks, "close"):
+            feed_chunks.close()
+
+# Open the job table that records the last completed stage of every episode
+def open_job_queue(queue_file=JOB_QUEUE_FILE):
+    """Return a connection to the SQLite job table, in WAL mode so several processes can share it."""
+    os.makedirs(os.path.dirname(queue_file), exist_ok=True)
+    # Autocommit, so claims can take the write lock explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(queue_file, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS jobs (guid TEXT PRIMARY KEY, stage TEXT NOT NULL, episode TEXT NOT NULL, "
+                 "attempts INTEGER NOT NULL DEFAULT 0, error TEXT, claimed_by TEXT, claimed_at REAL, updated_at REAL NOT NULL)")
+    return conn
+
+# Use the shared job table connection from one thread at a time
+@contextlib.contextmanager
+def job_queue():
+    """Yield the shared connection to the job table while holding job_queue_lock."""
+    global job_queue_conn
+    with job_queue_lock:
+        if job_queue_conn is None:
+            job_queue_conn = open_job_queue()
+        yield job_queue_conn
+
+# Episode keys worth keeping between runs; transcript text and timings are rebuilt on resume
+def job_fields(episode):
+    """Return the JSON stored with the job of an episode."""
+    return json.dumps({key: episode[key] for key in JOB_FIELDS if key in episode})
+
+# Whether the job of an episode already got past a stage, in this run or an earlier one
+def job_reached(episode, stage):
+    """Return True if the episode's job has completed the given stage."""
+    return JOB_STAGES.index(episode.get("stage", "queued")) >= JOB_STAGES.index(stage)
+
+# Whether another live process still holds the claim on a job
+def job_claim_held(claimed_by, claimed_at, now):
+    """Return True if the claim belongs to a different worker that is still running."""
+    if not claimed_by or claimed_by == JOB_WORKER_ID:
+        return False
+    host, _, pid = claimed_by.rpartition(":")
+    if host == socket.gethostname():
+        # A process on this machine that is gone will never finish its jobs
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, ValueError):
+            pass
+    return now - (claimed_at or 0) < JOB_CLAIM_TIMEOUT
+
+# Add a job for every new episode found in the feed
+def enqueue_jobs(episodes):
+    """Record new episodes as queued; episodes with an unfinished job keep the stage they reached."""
+    now = time.time()
+    with job_queue() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A committed episode that shows up as new again lost its database entry, so it starts over
+            conn.executemany("INSERT INTO jobs (guid, stage, episode, updated_at) VALUES (?, 'queued', ?, ?) "
+                             "ON CONFLICT(guid) DO UPDATE SET stage = 'queued', episode = excluded.episode, attempts = 0, "
+                             "error = NULL, updated_at = excluded.updated_at WHERE jobs.stage = 'committed'",
+                             [(episode["metadata"]["guid"], job_fields(episode), now) for episode in episodes])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+# Work out which stage a claimed job really reached from what it left on disk and in ChromaDB
+def resume_stage(episode, stage, known_guids):
+    """Return the last completed stage of a job whose outputs are still in place."""
+    metadata = episode["metadata"]
+    rank = JOB_STAGES.index(stage)
+    if rank >= JOB_STAGES.index("indexed") and metadata["guid"] in known_guids:
+        return "indexed"
+    if rank >= JOB_STAGES.index("transcribed"):
+        # The transcript may already have been moved into its podcast folder
+        for path in (episode.get("transcript_file"), transcript_path_for(metadata)):
+            if path and os.path.exists(path):
+                episode["transcript_file"] = path
+                return "transcribed"
+    mp3_file_path = episode.get("mp3_file_path")
+    if not mp3_file_path or not os.path.exists(mp3_file_path):
+        return "queued"
+    if rank >= JOB_STAGES.index("transcoded") and (not episode.get("wav_file") or os.path.exists(episode["wav_file"])):
+        return "transcoded"
+    return "downloaded"
+
+# Claim the unfinished jobs no other running process is working on
+def claim_jobs(known_guids, debug=True):
+    """Claim every unfinished job that is free and return its episodes, set to resume after their last completed stage."""
+    now = time.time()
+    with job_queue() as conn:
+        # BEGIN IMMEDIATE takes the write lock, so two processes can never claim the same job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT guid, stage, episode, attempts, claimed_by, claimed_at FROM jobs "
+                                "WHERE stage != 'committed' ORDER BY rowid").fetchall()
+            given_up = [row for row in rows if row[3] >= JOB_MAX_ATTEMPTS]
+            claimed = [row for row in rows if row[3] < JOB_MAX_ATTEMPTS and not job_claim_held(row[4], row[5], now)]
+            conn.executemany("UPDATE jobs SET claimed_by = ?, claimed_at = ? WHERE guid = ?",
+                             [(JOB_WORKER_ID, now, row[0]) for row in claimed])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    if given_up:
+        print(f"{len(given_up)} episodes failed {JOB_MAX_ATTEMPTS} times and are no longer retried.")
+    episodes = []
+    for guid, stage, episode_json, _, _, _ in claimed:
+        episode = json.loads(episode_json)
+        episode["stage"] = resume_stage(episode, stage, known_guids)
+        if episode["stage"] != stage:
+            advance_job(episode, episode["stage"])
+        if debug and episode["stage"] != "queued":
+            print(f"Resuming {episode['full_title']} after the {episode['stage']} stage.")
+        episodes.append(episode)
+    return episodes
+
+# Record that an episode finished a stage
+def advance_job(episode, stage):
+    """Move the episode's job to the given stage and store the paths it produced."""
+    episode["stage"] = stage
+    with job_queue() as conn:
+        conn.execute("UPDATE jobs SET stage = ?, episode = ?, error = NULL, updated_at = ? WHERE guid = ?",
+                     (stage, job_fields(episode), time.time(), episode["metadata"]["guid"]))
+
+# Record that an episode failed, so a later run retries it from its last completed stage
+def fail_job(episode, error):
+    """Count a failed attempt on the episode's job and release it."""
+    with job_queue() as conn:
+        conn.execute("UPDATE jobs SET attempts = attempts + 1, error = ?, claimed_by = NULL, updated_at = ? WHERE guid = ?",
+                     (str(error), time.time(), episode["metadata"]["guid"]))
+
+# Let other runs pick up whatever this run claimed but did not finish
+def release_jobs():
+    """Drop this process's claims on the job table."""
+    with job_queue() as conn:
+        conn.execute("UPDATE jobs SET claimed_by = NULL, claimed_at = NULL WHERE claimed_by = ?", (JOB_WORKER_ID,))
+
+# Mark indexed episodes as committed once the repository holds them
+def mark_jobs_committed():
+    """Move every indexed job to the committed stage."""
+    with job_queue() as conn:
+        conn.execute("UPDATE jobs SET stage = 'committed', claimed_by = NULL, updated_at = ? WHERE stage = 'indexed'", (time.time(),))
+
+# Whether an earlier run left work behind, checked before a run with an unchanged feed stops early
+def has_unfinished_jobs():
+    """Return True if the job table holds episodes that are not committed and may still be retried."""
+    if not os.path.exists(JOB_QUEUE_FILE):
+        return False
+    with job_queue() as conn:
+        row = conn.execute("SELECT 1 FROM jobs WHERE stage != 'committed' AND attempts < ? LIMIT 1", (JOB_MAX_ATTEMPTS,)).fetchone()
+    return row is not None
+
+# Marker placed on a pipeline queue once the stage feeding it has no more work
+PIPELINE_SENTINEL = object()
+
+# Start a pool of worker threads for one pipeline stage
+def start_pipeline_stage(stage_name, worker_count, inbox, outbox, handler):
+    """Start worker threads that take episodes from inbox, run handler on them and pass the results to outbox."""
+    def worker():
+        while True:
+            episode = inbox.get()
+            if episode is PIPELINE_SENTINEL:
+                inbox.put(PIPELINE_SENTINEL)  # Let the other workers of this stage see it too
+                return
+            try:
+                result = handler(episode)
+            except Exception as e:
+                print(f"{stage_name} failed for {episode['mp3_url']}: {e}")
+                failed_episodes.append(episode)
+                fail_job(episode, e)
+                continue
+            if result is not None:
+                outbox.put(result)
+
+    workers = [threading.Thread(target=worker, name=f"{stage_name}-{i}", daemon=True) for i in range(max(1, worker_count))]
+    for thread in workers:
+        thread.start()
+
+    # Tell the next stage there is no more work once every worker of this stage has finished
+    def close_stage():
+        for thread in workers:
+            thread.join()
+        outbox.put(PIPELINE_SENTINEL)
+
+    threading.Thread(target=close_stage, name=f"{stage_name}-closer", daemon=True).start()
+
+# Pipeline stage: download the episode audio
+def pipeline_download(episode, download_folder):
+    """Download the MP3 file of an episode."""
+    episode["started"] = time.perf_counter()
+    if job_reached(episode, "downloaded"):
+        return episode
+    with span("download", episode["metadata"]["guid"]) as record:
+        episode["mp3_file_path"], episode["filename"] = download_file(episode["mp3_url"], download_folder, episode["full_title"])
+        record["bytes"] = os.path.getsize(episode["mp3_file_path"])
+    advance_job(episode, "downloaded")
+    return episode
+
+# Pipeline stage: convert the episode audio to the WAV format whisper expects
+def pipeline_transcode(episode):
+    """Convert the downloaded MP3 file of an episode to WAV, unless the audio is piped into whisper or already transcribed."""
+    if job_reached(episode, "transcoded"):
+        return episode
+    with span("transcode", episode["metadata"]["guid"]) as record:
+        episode["cache_key"] = transcript_cache_key(episode["mp3_file_path"])
+        needs_wav = needs_wav_file() and load_cached_transcript(episode["cache_key"], touch=False) is None
+        episode["wav_file"] = convert_to_wav(episode["mp3_file_path"]) if needs_wav else None
+        if episode["wav_file"] and os.path.exists(episode["wav_file"]):
+            record["bytes"] = os.path.getsize(episode["wav_file"])
+    advance_job(episode, "transcoded")
+    return episode
+
+# Pipeline stage: transcribe the episode audio
+def pipeline_transcribe(episode):
+    """Transcribe the WAV file of an episode with Whisper."""
+    if job_reached(episode, "transcribed"):
+        return episode
+    with span("whisper", episode["metadata"]["guid"]) as record:
+        # The WAV file gives the audio length for free; otherwise ask ffprobe, which is quick next to whisper
+        if episode["wav_file"] and os.path.exists(episode["wav_file"]):
+            record["audio_seconds"] = round(os.path.getsize(episode["wav_file"]) / WAV_BYTES_PER_SECOND, 1)
+        elif load_cached_transcript(episode["cache_key"], touch=False) is None:
+            record["audio_seconds"] = get_audio_duration(episode["mp3_file_path"])
+        else:
+            record["cached"] = True
+        transcript_file, transcript_text = run_whisper_transcription(episode["mp3_file_path"], episode["wav_file"], episode["metadata"], cache_key=episode["cache_key"])
+        if transcript_file is None:
+            record["ok"] = False
+    if transcript_file is None:
+        print(f"Skipping {episode['mp3_url']}: no transcript was produced.")
+        failed_episodes.append(episode)
+        fail_job(episode, "no transcript was produced")
+        return None
+    episode["transcript_file"], episode["transcript_text"] = transcript_file, transcript_text
+    advance_job(episode, "transcribed")
+    return episode
+
+# Download, transcribe and index episodes with concurrent stages connected by bounded queues
+def run_episode_pipeline(episodes, download_folder, debug=True):
+    """Run the download, ffmpeg and whisper stages concurrently and index the results in ChromaDB."""
+    new_files = []  # MP3 files to delete once the run is finished
+    if not episodes:
+        return new_files
+
+    download_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    transcode_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    whisper_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    index_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+    start_pipeline_stage("download", DOWNLOAD_WORKERS, download_queue, transcode_queue,
+                         lambda episode: pipeline_download(episode, download_folder))
+    start_pipeline_stage("transcode", TRANSCODE_WORKERS, transcode_queue, whisper_queue, pipeline_transcode)
+    start_pipeline_stage("whisper", WHISPER_WORKERS, whisper_queue, index_queue, pipeline_transcribe)
+
+    # Feed the first stage from its own thread so a full queue cannot block the indexing below
+    def feed_episodes():
+        for episode in episodes:
+            download_queue.put(episode)
+        download_queue.put(PIPELINE_SENTINEL)
+
+    threading.Thread(target=feed_episodes, name="pipeline-feeder", daemon=True).start()
+
+    # Index finished episodes on this thread so ChromaDB only sees one writer
+    while True:
+        episode = index_queue.get()
+        if episode is PIPELINE_SENTINEL:
+            break
+        metadata = episode["metadata"]
+        mp3_url = episode["mp3_url"]
+        mp3_file_path = episode.get("mp3_file_path")
+        if job_reached(episode, "indexed"):
+            # Indexed by an earlier run that stopped before committing; only its MP3 file is left to clean up
+            if mp3_file_path:
+                new_files.append(mp3_file_path)
+            continue
+        try:
+            # Organize the transcript file and get the new path
+            new_transcript_path = organize_podcast_files(metadata["podcast_name"], metadata["episode_title"], episode["transcript_file"])
+
+            if debug:
+                print(f"Organized file: Transcript={new_transcript_path}")
+
+            # A resumed episode only kept its transcript file, not the text
+            if "transcript_text" not in episode:
+                episode["transcript_text"] = read_transcript_text(new_transcript_path)
+
+            # Save podcast metadata into the ChromaDB, including transcript text; embedding the passages happens here
+            with span("index", metadata["guid"]) as record:
+                record["bytes"] = len(episode["transcript_text"].encode("utf-8"))
+                add_podcast_to_db_chroma(metadata, mp3_url, os.path.basename(new_transcript_path), episode["transcript_text"])
+            episode["transcript_file"] = new_transcript_path
+            advance_job(episode, "indexed")
+
+            # The whole episode, from the start of its download until it was indexed
+            record_span("episode", time.perf_counter() - episode["started"], metadata["guid"])
+
+            # Add the MP3 file path to new_files for deletion later; WAV files are removed right after transcription
+            new_files.append(mp3_file_path)
+            print(f"Added to new_files: {mp3_file_path}")
+
+            if debug:
+                print(f"Downloaded, transcribed, and saved: {mp3_url} as {episode.get('filename')} with transcript {new_transcript_path}")
+
+        except Exception as e:
+            failed_episodes.append(episode)
+            fail_job(episode, e)
+            if debug:
+                print(f"Failed to process {mp3_url}: {e}")
+
+    return new_files
 
 # Process the RSS feed, download new MP3 files, transcribe them, and store data in ChromaDB
-def process_feed(feed_url, download_folder, history_file, debug=True):
+def process_feed(feed_url, download_folder, history_file, debug=True, feed_chunks=None):
     global podcast_collection
     """Process the RSS feed, download new MP3 files, transcribe them, and store data in ChromaDB."""
     
@@ -884,27 +2387,36 @@ def process_feed(feed_url, download_folder, history_file, debug=True):
         print("Using existing ChromaDB and transcript data.")
         # Skip fetching RSS feed and directly generate HTML
         generate_html_from_chroma_db(history_file)
+        if STATIC_ARCHIVE_ENABLED:
+            generate_static_archive()
         return []  # No new files to delete
 
     if debug:
         print(f"Fetching feed from {feed_url}")
     
-    response = requests.get(feed_url)
-    response.raise_for_status()
-
-    root = ET.fromstring(response.content)
-
-    new_files = []  # This will now store tuples of (mp3_file_path, wav_file_path)
+    # Collect the new episodes first so the pipeline can work on several of them at once
+    episodes = []
+    feed_read_started = time.perf_counter()
 
     # Adjust the limit for the first run if no existing data
     limit = 1 if not os.path.exists(CHROMADB_DB_PATH) else DEBUG_MODE_LIMIT
 
-    for item in root.findall('./channel/item')[:limit]:
-        full_title = item.find('title').text
-        pubDate = item.find('pubDate').text
-        guid = item.find('guid').text
-        link = item.find('link').text
-        enclosure = item.find('enclosure')
+    # Look up every processed GUID with a single query instead of one get() per feed item
+    known_guids = get_known_guids(podcast_collection)
+    indexed_guids = frozenset(known_guids)  # known_guids also gains the new feed items below
+    if debug:
+        print(f"Found {len(known_guids)} processed episodes in ChromaDB.")
+
+    # Use the feed already fetched by check_feed_for_changes when there is one
+    if feed_chunks is None:
+        feed_chunks = fetch_feed_chunks(feed_url)
+
+    for item in iter_feed_items(feed_chunks, is_known=known_guids.__contains__, max_items=limit, debug=debug):
+        full_title = item['title']
+        pubDate = item['pubDate']
+        guid = item['guid']
+        link = item['link']
+        mp3_url = item['enclosure_url']
 
         # Extract podcast and episode titles
         try:
@@ -919,69 +2431,51 @@ def process_feed(feed_url, download_folder, history_file, debug=True):
         # Use pubDate as listenDate
         listenDate = pubDate if pubDate else datetime.now().strftime("%a, %d %b %Y %H:%M:%S %z")
         
-        if enclosure is not None:
-            mp3_url = enclosure.get('url')
-            if mp3_url:
-                if debug:
-                    print(f"Enclosure URL found: {mp3_url}")
-                
-                # Construct metadata dictionary
-                metadata = {
-                    "podcast_name": podcast_name,
-                    "episode_title": episode_title,
-                    "listenDate": listenDate,
-                    "guid": guid if guid else mp3_url,
-                    "link": link if link else ""
-                }
-                
-                # Check if the guid already exists in the collection
-                existing_doc = podcast_collection.get(ids=[guid])
-                already_processed = len(existing_doc['ids']) > 0
-
-                if already_processed:
-                    if debug:
-                        print(f"File already processed: {mp3_url}")
-                    continue
-
-                try:
-                    # Download the MP3 file
-                    mp3_file_path, filename = download_file(mp3_url, download_folder, full_title)
-                    
-                    # Transcribe using Whisper
-                    transcript_file, transcript_text = transcribe_with_whisper(mp3_file_path, metadata)
-
-                    # Organize the transcript file and get the new path
-                    new_transcript_path = organize_podcast_files(podcast_name, episode_title, transcript_file)
-
-                    if debug:
-                        print(f"Organized file: Transcript={new_transcript_path}")
-
-                    # Save podcast metadata into the ChromaDB, including transcript text
-                    add_podcast_to_db_chroma(metadata, mp3_url, os.path.basename(new_transcript_path), transcript_text)
-
-                    # Add both the MP3 and WAV file paths to new_files for deletion later
-                    wav_file = mp3_file_path.replace('.mp3', '.wav')
-                    new_files.append((mp3_file_path, wav_file))  # Append tuple with MP3 and WAV paths
-                    print(f"Added to new_files: {mp3_file_path}, {wav_file}")
+        if mp3_url:
+            if debug:
+                print(f"Enclosure URL found: {mp3_url}")
+            
+            # Construct metadata dictionary
+            metadata = {
+                "podcast_name": podcast_name,
+                "episode_title": episode_title,
+                "listenDate": listenDate,
+                "guid": guid if guid else mp3_url,
+                "link": link if link else ""
+            }
 
-                    if debug:
-                        print(f"Downloaded, transcribed, and saved: {mp3_url} as {filename} with transcript {new_transcript_path}")
-                    
-                except Exception as e:
-                    if debug:
-                        print(f"Failed to process {mp3_url}: {e}")
+            episodes.append({"metadata": metadata, "mp3_url": mp3_url, "full_title": full_title})
+            # Treat the episode as known from now on so a duplicate feed entry is not processed twice
+            known_guids.add(metadata["guid"])
         else:
             if debug:
                 print(f"No enclosure found for {full_title}")
 
+    record_span("feed_read", time.perf_counter() - feed_read_started, episodes=len(episodes))
+
+    # Record the new episodes in the job table and take every unfinished job, including those left by a run that died
+    enqueue_jobs(episodes)
+    episodes = claim_jobs(indexed_guids, debug=debug)
+
+    # Download, transcribe and index the new episodes, resuming each one after its last completed stage
+    try:
+        with span("pipeline", episodes=len(episodes)):
+            new_files = run_episode_pipeline(episodes, download_folder, debug=debug)
+    finally:
+        release_jobs()
+
     # Ensure HTML is generated
     if new_files or debug:
         print("Generating HTML file...")
-        generate_html_from_chroma_db(history_file)
+        with span("html"):
+            generate_html_from_chroma_db(history_file)
+        if STATIC_ARCHIVE_ENABLED:
+            with span("archive"):
+                generate_static_archive()
     else:
         print("No new podcasts found, skipping HTML generation.")
 
-    return new_files  # Now returns tuples of (mp3_file_path, wav_file_path)
+    return new_files  # MP3 file paths to delete after the run
 
 # Format the date to 'Month Day, Year' for TXT files
 def format_date_long(date_str):
@@ -1022,9 +2516,120 @@ def normalize_folder_name(title):
     """Normalize folder names by replacing spaces with underscores and removing non-alphanumeric characters."""
     return re.sub(r'[^\w\s-]', '', title).replace(" ", "_").strip("_")
 
+# Return the shared HTTP session, creating it on first use
+def get_http_session():
+    """Return a requests.Session with a connection pool large enough for all download workers."""
+    # requests is imported where it is used, so a run that finds nothing new never loads it
+    import requests
+    global http_session
+    with http_session_lock:
+        if http_session is None:
+            pool_size = max(1, DOWNLOAD_WORKERS) * max(1, DOWNLOAD_PARALLEL_RANGES)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            http_session = session
+    return http_session
+
+# Raised when a download ends before the number of bytes announced by the server arrived
+class IncompleteDownloadError(IOError):
+    pass
+
+# Total size of the file from a Content-Range header such as "bytes 100-199/2000" or "bytes */2000"
+def content_range_total(content_range):
+    """Return the total file size announced in a Content-Range header, or None if it is unknown."""
+    if not content_range or "/" not in content_range:
+        return None
+    total = content_range.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+# Download one byte range of a file into its own part file, resuming whatever is already there
+def download_byte_range(url, part_path, start, end):
+    """Download bytes start..end (inclusive) of url into part_path, resuming a partial part file."""
+    import requests
+    expected = end - start + 1
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if done >= expected:
+            break
+        headers = {"Range": f"bytes={start + done}-{end}"}
+        try:
+            with get_http_session().get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise IncompleteDownloadError(f"Server ignored the range request for {url}")
+                with open(part_path, "ab") as f:
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError) as e:
+            print(f"Range {start}-{end} of {url} interrupted (attempt {attempt + 1}): {e}")
+            time.sleep(min(2 ** attempt, 30))
+
+    done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if done != expected:
+        raise IncompleteDownloadError(f"Got {done} of {expected} bytes for range {start}-{end} of {url}")
+
+# Download a large file as several byte ranges at once and join them into part_path
+def download_in_parallel_ranges(url, part_path, total_size):
+    """Fetch a file as DOWNLOAD_PARALLEL_RANGES concurrent byte ranges and concatenate them."""
+    range_size = -(-total_size // DOWNLOAD_PARALLEL_RANGES)
+    ranges = [(i, start, min(start + range_size, total_size) - 1)
+              for i, start in enumerate(range(0, total_size, range_size))]
+    print(f"Downloading {url} as {len(ranges)} parallel ranges ({total_size} bytes)")
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(download_byte_range, url, f"{part_path}.{i}", start, end) for i, start, end in ranges]
+        for future in futures:
+            future.result()
+
+    with open(part_path, "wb") as f:
+        for i, _, _ in ranges:
+            with open(f"{part_path}.{i}", "rb") as range_file:
+                shutil.copyfileobj(range_file, f, DOWNLOAD_CHUNK_SIZE)
+    for i, _, _ in ranges:
+        os.remove(f"{part_path}.{i}")
+
+# Download url into part_path over one connection, resuming a partial file with an HTTP Range request
+def download_to_part_file(url, part_path):
+    """Download or resume url into part_path and return the total size announced by the server, if any."""
+    done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={done}-"} if done else {}
+
+    with get_http_session().get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as r:
+        # The part file already holds the whole file
+        if r.status_code == 416 and done:
+            return content_range_total(r.headers.get("Content-Range")) or done
+        r.raise_for_status()
+
+        if done and r.status_code == 206:
+            mode = "ab"
+            total_size = content_range_total(r.headers.get("Content-Range"))
+            print(f"Resuming {url} at byte {done}")
+        else:
+            # Fresh download, or the server does not support ranges and sends the whole file again
+            mode = "wb"
+            content_length = r.headers.get("Content-Length")
+            total_size = int(content_length) if content_length and content_length.isdigit() else None
+
+            if (total_size and DOWNLOAD_PARALLEL_THRESHOLD and DOWNLOAD_PARALLEL_RANGES > 1
+                    and total_size >= DOWNLOAD_PARALLEL_THRESHOLD
+                    and r.headers.get("Accept-Ranges", "").lower() == "bytes"):
+                r.close()
+                download_in_parallel_ranges(url, part_path, total_size)
+                return total_size
+
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+
+    return total_size
+
 # Download the file from the URL and save it to the folder with a readable filename
 def download_file(url, folder, title):
     """Download the file from the URL and save it to the folder with a readable filename."""
+    import requests
     # Ensure the folder exists
     if not os.path.exists(folder):
         os.makedirs(folder, exist_ok=True)
@@ -1036,61 +2641,496 @@ def download_file(url, folder, title):
         filename += ".mp3"
 
     mp3_file_path = os.path.join(folder, filename)
+    part_path = mp3_file_path + ".part"
     
     print(f"Downloading {url} to {mp3_file_path}")
-    with requests.get(url, stream=True) as r:
-        r.raise_for_status()
-        with open(mp3_file_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            total_size = download_to_part_file(url, part_path)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                requests.exceptions.ChunkedEncodingError, IncompleteDownloadError) as e:
+            if attempt == DOWNLOAD_RETRIES:
+                raise
+            print(f"Download of {url} interrupted (attempt {attempt + 1}), resuming: {e}")
+            time.sleep(min(2 ** attempt, 30))
+            continue
+
+        # Make sure the whole file arrived before it is handed to transcription
+        downloaded_size = os.path.getsize(part_path)
+        if total_size is not None and downloaded_size != total_size:
+            if downloaded_size > total_size:
+                # The part file belongs to a different version of the file; start over
+                os.remove(part_path)
+            if attempt == DOWNLOAD_RETRIES:
+                raise IncompleteDownloadError(f"Downloaded {downloaded_size} of {total_size} bytes from {url}")
+            print(f"Download of {url} incomplete ({downloaded_size} of {total_size} bytes), resuming")
+            continue
+        break
+
+    os.replace(part_path, mp3_file_path)
     return mp3_file_path, filename
 
-# Transcribe the audio using Whisper and save to a text file
-def transcribe_with_whisper(file_path, metadata):
-    """Transcribe audio using Whisper and save to a text file."""
+# Convert an MP3 file to a 16 kHz mono WAV file for Whisper
+def convert_to_wav(file_path):
+    """Convert an MP3 file to a 16 kHz mono WAV file next to it and return the WAV path."""
     wav_file = file_path.replace('.mp3', '.wav')
-    
+    overwrite_option = "-y" if AUTO_OVERWRITE else ""
+    conversion_command = f"ffmpeg {overwrite_option} -i \"{file_path}\" -ar 16000 -ac 1 -c:a pcm_s16le \"{wav_file}\""
+    os.system(conversion_command)
+    return wav_file
+
+# Hash of the whisper model file, cached by size and modification time so the model is only read once
+def whisper_model_hash():
+    """Return the SHA-256 of WHISPER_MODEL_PATH, reusing the stored value while the file is unchanged."""
+    global whisper_model_hash_value
+    if whisper_model_hash_value is not None:
+        return whisper_model_hash_value
+
+    model_path = os.path.expanduser(WHISPER_MODEL_PATH)
+    stat = os.stat(model_path)
+    fingerprint = f"{model_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    hashes_file = os.path.join(TRANSCRIPT_CACHE_DIR, "model_hashes.json")
+    stored = load_state_file(hashes_file)
+    if fingerprint not in stored:
+        print(f"Hashing whisper model {model_path}")
+        stored[fingerprint] = file_hash(model_path)
+        save_state_file(hashes_file, stored)
+    whisper_model_hash_value = stored[fingerprint]
+    return whisper_model_hash_value
+
+# Settings besides the model that change what whisper writes for the same audio
+def whisper_cache_args():
+    """Return a string describing the transcription settings that affect the transcript."""
+    if WHISPER_CHUNKED:
+        return f"-otxt chunked:{WHISPER_CHUNK_SECONDS}:{WHISPER_CHUNK_OVERLAP_SECONDS}"
+    return "-otxt"
+
+# Content address of the transcript of an audio file: audio hash, model hash and whisper arguments
+def transcript_cache_key(file_path):
+    """Return the transcript cache key of an audio file, or None when the cache is disabled."""
+    if not TRANSCRIPT_CACHE_DIR:
+        return None
+    key_parts = [file_hash(file_path), whisper_model_hash(), whisper_cache_args()]
+    return hashlib.sha256("\n".join(key_parts).encode()).hexdigest()
+
+# Path of a cached transcript
+def transcript_cache_path(cache_key):
+    """Return the path of the cache entry for a key."""
+    return os.path.join(TRANSCRIPT_CACHE_DIR, cache_key[:2], f"{cache_key}.txt")
+
+# Return a cached transcript and mark it as recently used
+def load_cached_transcript(cache_key, touch=True):
+    """Return the cached raw transcript for a key, or None if there is none."""
+    if not cache_key:
+        return None
+    path = transcript_cache_path(cache_key)
+    try:
+        with open(path, "r") as f:
+            transcript_text = f.read()
+    except OSError:
+        return None
+    if touch:
+        os.utime(path)  # The modification time doubles as the last-used time for LRU eviction
+    return transcript_text
+
+# Store a transcript in the cache and evict the least recently used entries beyond the size limit
+def store_cached_transcript(cache_key, transcript_text):
+    """Save a raw transcript under its cache key."""
+    if not cache_key:
+        return
+    path = transcript_cache_path(cache_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(transcript_text)
+    os.replace(temp_path, path)
+    evict_transcript_cache()
+
+# Remove the least recently used cached transcripts until the cache fits TRANSCRIPT_CACHE_MAX_BYTES
+def evict_transcript_cache():
+    """Delete the oldest cache entries while the cache is larger than TRANSCRIPT_CACHE_MAX_BYTES."""
+    if not TRANSCRIPT_CACHE_MAX_BYTES:
+        return
+    with transcript_cache_lock:
+        entries = []
+        for root, dirs, files in os.walk(TRANSCRIPT_CACHE_DIR):
+            for name in files:
+                if name.endswith(".txt"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= TRANSCRIPT_CACHE_MAX_BYTES:
+                break
+            os.remove(path)
+            total_size -= size
+            print(f"Evicted cached transcript {path}")
+
+# Path (without the .txt extension) whisper writes the transcript of an audio file to
+def transcript_output_base(file_path):
+    """Return the --output-file path for the transcript of an audio file."""
     # Ensure the TRANSCRIBED_FOLDER exists before any file writing
     if not os.path.exists(TRANSCRIBED_FOLDER):
         os.makedirs(TRANSCRIBED_FOLDER, exist_ok=True)
+    return os.path.join(TRANSCRIBED_FOLDER, os.path.basename(file_path).replace('.mp3', ''))
+
+# Read the transcript written by whisper and add the episode title and link at the top
+def finalize_transcript(transcription_file, metadata):
+    """Return (txt_file, transcript_text) for a finished transcription, or (None, None) if it is missing."""
+    # Check if the transcription file was created
+    txt_file = transcription_file + ".txt"
+    if not os.path.exists(txt_file):
+        print(f"Warning: Transcription file {txt_file} was not created.")
+        return None, None
+    
+    # Read the transcription content
+    with open(txt_file, "r") as f:
+        transcript_text = f.read()
     
+    # Add metadata to the transcription file
+    with open(txt_file, "r+") as f:
+        original_content = f.read()
+        f.seek(0)
+        original_title = metadata['episode_title']
+        f.write(f"{original_title}\n{metadata['link']}\n\n")
+        f.write(original_content)
+    
+    return txt_file, transcript_text
+
+# Decode the audio with ffmpeg and pipe the PCM straight into whisper without writing a WAV file
+def stream_audio_to_whisper(file_path, transcription_file):
+    """Run ffmpeg | whisper -f - and return True if whisper produced a transcript."""
+    global whisper_reads_stdin
+    ffmpeg_command = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", file_path,
+                      "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le", "-f", "wav", "-"]
+    whisper_command = [os.path.expanduser(WHISPER_EXECUTABLE), "-m", os.path.expanduser(WHISPER_MODEL_PATH),
+                       "-f", "-", "-otxt", "--output-file", transcription_file]
+
+    ffmpeg_process = subprocess.Popen(ffmpeg_command, stdout=subprocess.PIPE)
+    whisper_process = subprocess.Popen(whisper_command, stdin=ffmpeg_process.stdout)
+    ffmpeg_process.stdout.close()  # Let ffmpeg see a broken pipe if whisper exits early
+    whisper_returncode = whisper_process.wait()
+    ffmpeg_returncode = ffmpeg_process.wait()
+
+    if whisper_returncode != 0 or not os.path.exists(transcription_file + ".txt"):
+        # Most likely an older whisper build that cannot read audio from stdin; stop trying for this run
+        print(f"Whisper could not transcribe audio piped from ffmpeg (exit code {whisper_returncode}). Falling back to WAV files.")
+        whisper_reads_stdin = False
+        return False
+    if ffmpeg_returncode != 0:
+        raise subprocess.CalledProcessError(ffmpeg_returncode, ffmpeg_command)
+
+    whisper_reads_stdin = True
+    return True
+
+# Base URL of the local whisper server
+def whisper_server_url():
+    """Return the base URL of the local whisper server."""
+    return f"http://127.0.0.1:{WHISPER_SERVER_PORT}"
+
+# Check that the whisper server process is alive and answering HTTP requests
+def whisper_server_healthy():
+    """Return True if the whisper server is running and responds to a request."""
+    import requests
+    if whisper_server_process is None or whisper_server_process.poll() is not None:
+        return False
+    try:
+        return requests.get(whisper_server_url() + "/", timeout=2).status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+# Stop the whisper server process if it is running
+def stop_whisper_server():
+    """Terminate the whisper server process."""
+    global whisper_server_process
+    if whisper_server_process is not None and whisper_server_process.poll() is None:
+        whisper_server_process.terminate()
+        try:
+            whisper_server_process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            whisper_server_process.kill()
+        print("Whisper server stopped.")
+    whisper_server_process = None
+
+# Start the whisper server and wait until the model is loaded
+def start_whisper_server():
+    """Start the whisper.cpp server with WHISPER_MODEL_PATH loaded and wait until it answers."""
+    global whisper_server_process
+    os.makedirs(PODSCRIBER_STATE_DIR, exist_ok=True)
+    log_path = os.path.join(PODSCRIBER_STATE_DIR, "whisper_server.log")
+    command = [os.path.expanduser(WHISPER_SERVER_EXECUTABLE), "-m", os.path.expanduser(WHISPER_MODEL_PATH),
+               "--host", "127.0.0.1", "--port", str(WHISPER_SERVER_PORT)]
+    print(f"Starting whisper server on port {WHISPER_SERVER_PORT} (log: {log_path})")
+    with open(log_path, "ab") as log_file:
+        whisper_server_process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + WHISPER_SERVER_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if whisper_server_process.poll() is not None:
+            print(f"Whisper server exited during startup with code {whisper_server_process.returncode}.")
+            return False
+        if whisper_server_healthy():
+            print("Whisper server is ready.")
+            return True
+        time.sleep(0.5)
+    print("Whisper server did not become ready in time.")
+    stop_whisper_server()
+    return False
+
+# Make sure a healthy whisper server is running, restarting it if it crashed or hangs
+def ensure_whisper_server():
+    """Return True once a healthy whisper server is running."""
+    with whisper_server_lock:
+        if whisper_server_healthy():
+            return True
+        if whisper_server_process is not None:
+            print("Whisper server is not responding. Restarting it.")
+            stop_whisper_server()
+        return start_whisper_server()
+
+# Transcribe a WAV file with the persistent whisper server
+def transcribe_with_whisper_server(wav_file, transcription_file):
+    """Send a WAV file to the whisper server, write the transcript to transcription_file.txt and return True on success."""
+    import requests
+    # A server that hangs without crashing would otherwise block this worker, and the pipeline behind it, forever
+    audio_seconds = os.path.getsize(wav_file) / WAV_BYTES_PER_SECOND
+    read_timeout = max(WHISPER_SERVER_MIN_TIMEOUT, audio_seconds * WHISPER_SERVER_TIMEOUT_FACTOR)
+    for attempt in range(2):
+        if not ensure_whisper_server():
+            return False
+        try:
+            with open(wav_file, "rb") as f:
+                response = requests.post(
+                    whisper_server_url() + "/inference",
+                    files={"file": (os.path.basename(wav_file), f, "audio/wav")},
+                    data={"response_format": "text"},
+                    timeout=(10, read_timeout),
+                )
+            response.raise_for_status()
+        except requests.exceptions.Timeout as e:
+            # The server may still answer health checks while stuck, so restart it before sending the job again
+            print(f"Whisper server did not answer within {read_timeout:.0f} seconds (attempt {attempt + 1}): {e}")
+            with whisper_server_lock:
+                stop_whisper_server()
+            continue
+        except requests.exceptions.RequestException as e:
+            # A crash mid-request is handled by restarting the server and sending the job again
+            print(f"Whisper server request failed (attempt {attempt + 1}): {e}")
+            continue
+        with open(transcription_file + ".txt", "w") as f:
+            f.write(response.text)
+        return True
+    return False
+
+# Whether audio is piped into whisper instead of going through a WAV file
+def use_audio_streaming():
+    """Return True while streaming is enabled and whisper has not failed to read stdin."""
+    return WHISPER_STREAM_AUDIO and whisper_reads_stdin is not False
+
+# Whether the audio has to be converted to a WAV file before transcription
+def needs_wav_file():
+    """Return True if the transcription step needs a WAV file on disk."""
+    return WHISPER_SERVER_ENABLED or not use_audio_streaming()
+
+# Length of an audio file in seconds according to ffprobe
+def get_audio_duration(file_path):
+    """Return the duration of an audio file in seconds, or None if ffprobe cannot tell."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", file_path],
+            capture_output=True, text=True
+        )
+        return float(result.stdout.strip())
+    except (OSError, ValueError):
+        return None
+
+# Find the silent stretches of an episode with ffmpeg's silencedetect filter
+def detect_silences(file_path):
+    """Return the midpoints in seconds of the silences ffmpeg finds in an audio file."""
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-i", file_path, "-af", "silencedetect=noise=-35dB:d=0.4", "-f", "null", "-"],
+        capture_output=True, text=True
+    )
+    midpoints = []
+    silence_start = None
+    for line in result.stderr.splitlines():
+        start_match = re.search(r"silence_start: (-?[\d.]+)", line)
+        end_match = re.search(r"silence_end: (-?[\d.]+)", line)
+        if start_match:
+            silence_start = float(start_match.group(1))
+        elif end_match and silence_start is not None:
+            midpoints.append((max(silence_start, 0.0) + float(end_match.group(1))) / 2)
+            silence_start = None
+    return midpoints
+
+# Split an episode into pieces of about WHISPER_CHUNK_SECONDS, cutting in silences where possible
+def plan_audio_chunks(duration, silences):
+    """Return a list of (start, end) seconds covering the whole episode, with cuts moved into nearby silences."""
+    cuts = [0.0]
+    target = WHISPER_CHUNK_SECONDS
+    window = WHISPER_CHUNK_SECONDS / 4
+    while duration - target > WHISPER_CHUNK_SECONDS / 2:
+        nearby = [s for s in silences if abs(s - target) <= window and s > cuts[-1]]
+        cut = min(nearby, key=lambda s: abs(s - target)) if nearby else target
+        cuts.append(cut)
+        target = cut + WHISPER_CHUNK_SECONDS
+    cuts.append(duration)
+    return list(zip(cuts, cuts[1:]))
+
+# Transcribe part of an audio file with whisper and return its timed segments
+def transcribe_audio_chunk(file_path, start, end, work_dir, index):
+    """Transcribe file_path from start to end seconds and return (start_ms, end_ms, text) segments relative to start."""
+    global whisper_reads_stdin
+    output_base = os.path.join(work_dir, f"chunk{index}")
+    ffmpeg_command = ["ffmpeg", "-nostdin", "-loglevel", "error", "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}",
+                      "-i", file_path, "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le", "-f", "wav"]
+    whisper_command = [os.path.expanduser(WHISPER_EXECUTABLE), "-m", os.path.expanduser(WHISPER_MODEL_PATH),
+                       "-t", str(WHISPER_THREADS_PER_PROCESS), "-ocsv", "--output-file", output_base]
+
+    streamed = False
+    if use_audio_streaming():
+        ffmpeg_process = subprocess.Popen(ffmpeg_command + ["-"], stdout=subprocess.PIPE)
+        whisper_process = subprocess.Popen(whisper_command + ["-f", "-"], stdin=ffmpeg_process.stdout)
+        ffmpeg_process.stdout.close()
+        whisper_returncode = whisper_process.wait()
+        ffmpeg_returncode = ffmpeg_process.wait()
+        if whisper_returncode != 0 or not os.path.exists(output_base + ".csv"):
+            # Most likely a whisper build that cannot read audio from stdin; this chunk and later ones use WAV files
+            print(f"Whisper could not transcribe chunk {index} piped from ffmpeg (exit code {whisper_returncode}). Falling back to WAV files.")
+            whisper_reads_stdin = False
+        elif ffmpeg_returncode != 0:
+            # A failed decode would otherwise leave a silently truncated chunk
+            raise subprocess.CalledProcessError(ffmpeg_returncode, ffmpeg_command)
+        else:
+            streamed = True
+
+    if not streamed:
+        wav_file = output_base + ".wav"
+        subprocess.run(ffmpeg_command + ["-y", wav_file], check=True)
+        whisper_returncode = subprocess.run(whisper_command + ["-f", wav_file]).returncode
+        os.remove(wav_file)
+
+    if whisper_returncode != 0:
+        raise subprocess.CalledProcessError(whisper_returncode, whisper_command)
+
+    segments = []
+    with open(output_base + ".csv", newline="") as f:
+        for row in csv.DictReader(f):
+            segments.append((int(row["start"]), int(row["end"]), row["text"]))
+    return segments
+
+# Merge the segments of overlapping chunks into one timeline without repeating the overlap
+def stitch_chunk_segments(chunks, chunk_segments):
+    """Shift chunk segments to episode time and keep each one only in the chunk that owns its midpoint."""
+    stitched = []
+    for (core_start, core_end, window_start), segments in zip(chunks, chunk_segments):
+        is_last = core_end == chunks[-1][1]
+        for start_ms, end_ms, text in segments:
+            absolute_start = window_start * 1000 + start_ms
+            absolute_end = window_start * 1000 + end_ms
+            midpoint = (absolute_start + absolute_end) / 2000
+            if midpoint < core_start or (midpoint >= core_end and not is_last):
+                continue
+            # Drop a segment the previous chunk already produced around the cut
+            if stitched and stitched[-1][2].strip() == text.strip() and absolute_start < stitched[-1][1]:
+                continue
+            stitched.append((absolute_start, absolute_end, text))
+    return stitched
+
+# Transcribe a long episode as overlapping chunks with a pool of whisper processes
+def transcribe_in_chunks(file_path, duration, transcription_file):
+    """Transcribe an episode in parallel chunks and write the stitched transcript to transcription_file.txt."""
+    chunks = []
+    for core_start, core_end in plan_audio_chunks(duration, detect_silences(file_path)):
+        window_start = max(0.0, core_start - WHISPER_CHUNK_OVERLAP_SECONDS)
+        window_end = min(duration, core_end + WHISPER_CHUNK_OVERLAP_SECONDS)
+        chunks.append((core_start, core_end, window_start, window_end))
+    print(f"Transcribing {file_path} as {len(chunks)} chunks with {WHISPER_CHUNK_PROCESSES} whisper processes")
+
+    with tempfile.TemporaryDirectory(prefix="podscriber-chunks-") as work_dir:
+        with ThreadPoolExecutor(max_workers=max(1, WHISPER_CHUNK_PROCESSES)) as executor:
+            futures = [executor.submit(transcribe_audio_chunk, file_path, window_start, window_end, work_dir, i)
+                       for i, (_, _, window_start, window_end) in enumerate(chunks)]
+            chunk_segments = [future.result() for future in futures]
+
+    segments = stitch_chunk_segments([(a, b, w) for a, b, w, _ in chunks], chunk_segments)
+    with open(transcription_file + ".txt", "w") as f:
+        for _, _, text in segments:
+            f.write(f"{text}\n")
+
+# Run Whisper the configured way and leave the raw transcript in transcription_file.txt
+def write_whisper_transcript(file_path, wav_file, transcription_file):
+    """Transcribe audio with Whisper, piping it from ffmpeg when wav_file is None."""
+    # Spread long episodes over several whisper processes
+    if WHISPER_CHUNKED:
+        duration = get_audio_duration(file_path)
+        if duration and duration > WHISPER_CHUNK_SECONDS * 1.5:
+            transcribe_in_chunks(wav_file or file_path, duration, transcription_file)
+            return
+
+    # Send the job to the whisper server that already has the model loaded
+    if WHISPER_SERVER_ENABLED:
+        if wav_file is None:
+            wav_file = convert_to_wav(file_path)
+        if transcribe_with_whisper_server(wav_file, transcription_file):
+            return
+        print("Whisper server unavailable. Running the whisper executable instead.")
+
+    if wav_file is None:
+        if stream_audio_to_whisper(file_path, transcription_file):
+            return
+        wav_file = convert_to_wav(file_path)
+    
+    # Transcribe using Whisper and capture the output with word timestamps
+    transcription_command = f"{WHISPER_EXECUTABLE} -m {WHISPER_MODEL_PATH} -f \"{wav_file}\" -otxt --output-file \"{transcription_file}\""
+    subprocess.run(transcription_command, shell=True, check=True)
+
+# Run Whisper on a WAV file and save the transcript to a text file
+def run_whisper_transcription(file_path, wav_file, metadata, cache_key=None):
+    """Transcribe audio with Whisper, or reuse a cached transcript of the same audio, and save the transcript."""
     try:
-        # Convert mp3 to wav using ffmpeg
-        overwrite_option = "-y" if AUTO_OVERWRITE else ""
-        conversion_command = f"ffmpeg {overwrite_option} -i \"{file_path}\" -ar 16000 -ac 1 -c:a pcm_s16le \"{wav_file}\""
-        os.system(conversion_command)
-        
         # Prepare transcription file path
-        transcription_file = os.path.join(TRANSCRIBED_FOLDER, os.path.basename(file_path).replace('.mp3', ''))
-        
-        # Transcribe using Whisper and capture the output with word timestamps
-        transcription_command = f"{WHISPER_EXECUTABLE} -m {WHISPER_MODEL_PATH} -f \"{wav_file}\" -otxt --output-file \"{transcription_file}\""
-        subprocess.run(transcription_command, shell=True, check=True)
-        
-        # Check if the transcription file was created
-        txt_file = transcription_file + ".txt"
-        if not os.path.exists(txt_file):
-            print(f"Warning: Transcription file {txt_file} was not created.")
-            return None, None
-        
-        # Read the transcription content
-        with open(txt_file, "r") as f:
-            transcript_text = f.read()
-        
-        # Add metadata to the transcription file
-        with open(txt_file, "r+") as f:
-            original_content = f.read()
-            f.seek(0)
-            original_title = metadata['episode_title']
-            f.write(f"{original_title}\n{metadata['link']}\n\n")
-            f.write(original_content)
-        
+        transcription_file = transcript_output_base(file_path)
+
+        if cache_key is None:
+            cache_key = transcript_cache_key(file_path)
+        cached_text = load_cached_transcript(cache_key)
+        if cached_text is not None:
+            print(f"Using cached transcript for {file_path}")
+            with open(transcription_file + ".txt", "w") as f:
+                f.write(cached_text)
+            return finalize_transcript(transcription_file, metadata)
+
+        write_whisper_transcript(file_path, wav_file, transcription_file)
+        txt_file, transcript_text = finalize_transcript(transcription_file, metadata)
+        if transcript_text is not None:
+            store_cached_transcript(cache_key, transcript_text)
         return txt_file, transcript_text
 
     except Exception as e:
         print(f"Error during transcription: {e}")
         return None, None
 
+    finally:
+        # The WAV file is only needed while whisper runs
+        wav_path = file_path.replace('.mp3', '.wav')
+        for path in {wav_file, wav_path}:
+            if path and path != file_path and os.path.exists(path):
+                os.remove(path)
+
+# Transcribe the audio using Whisper and save to a text file
+def transcribe_with_whisper(file_path, metadata):
+    """Transcribe audio using Whisper and save to a text file."""
+    try:
+        cache_key = transcript_cache_key(file_path)
+        needs_wav = needs_wav_file() and load_cached_transcript(cache_key, touch=False) is None
+        wav_file = convert_to_wav(file_path) if needs_wav else None
+    except Exception as e:
+        print(f"Error during transcription: {e}")
+        return None, None
+    return run_whisper_transcription(file_path, wav_file, metadata, cache_key=cache_key)
+
 # Organize podcast transcript files into folders and return the new file path
 def organize_podcast_files(podcast_name, episode_title, transcript_file):
     """Organize podcast transcript files into folders and return the new file path."""
@@ -1108,116 +3148,6 @@ def organize_podcast_files(podcast_name, episode_title, transcript_file):
 
     return new_transcript_path
 
-# Initialize the PodcastHistory file with a header, if it does not exist
-def start_html_log(history_file):
-    """Initialize the PodcastHistory file with a header, if it does not exist."""
-    header = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Podcast &#x1F442; Archive</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        /* Optional: Custom styles can go here */
-    </style>
-</head>
-<body class="bg-gray-100">
-    <div class="container mx-auto p-4">
-        <h2 class="text-3xl font-bold mb-4">Podcast &#x1F442; Archive</h2>
-        <table id="podcastTable" class="min-w-full bg-white shadow-md rounded-lg overflow-hidden">
-            <thead>
-                <tr class="bg-blue-500 text-white uppercase text-sm leading-normal">
-                    <th class="py-3 px-6 text-left">Podcast</th>
-                    <th class="py-3 px-6 text-left">Episode</th>
-                    <th class="py-3 px-6 text-left">Listen Date</th>
-                    <th class="py-3 px-6 text-left">Transcript</th>
-                    <th class="py-3 px-6 text-left">Stream</th>
-                </tr>
-            </thead>
-            <tbody class="text-gray-600 text-sm font-light">
-                """
-    with open(history_file, "w") as f:
-        f.write(header)
-
-# Add a footer to the PodcastHistory file
-def end_html_log(history_file):
-    """Finalize the PodcastHistory file with a footer."""
-    footer = """
-            </tbody>
-        </table>
-    </div>
-    <script>
-        function sortTable(n) {
-          var table, rows, switching, i, x, y, shouldSwitch, dir, switchcount = 0;
-          table = document.getElementById("podcastTable");
-          switching = true;
-          dir = "asc"; 
-          while (switching) {
-            switching = false;
-            rows = table.rows;
-            for (i = 1; i < (rows.length - 1); i++) {
-              shouldSwitch = false;
-              x = rows[i].getElementsByTagName("TD")[n];
-              y = rows[i + 1].getElementsByTagName("TD")[n];
-              if (dir == "asc") {
-                if (x.innerHTML.toLowerCase() > y.innerHTML.toLowerCase()) {
-                  shouldSwitch = true;
-                  break;
-                }
-              } else if (dir == "desc") {
-                if (x.innerHTML.toLowerCase() < y.innerHTML.toLowerCase()) {
-                  shouldSwitch = true;
-                  break;
-                }
-              }
-            }
-            if (shouldSwitch) {
-              rows[i].parentNode.insertBefore(rows[i + 1], rows[i]);
-              switching = true;
-              switchcount ++;      
-            } else {
-              if (switchcount == 0 && dir == "asc") {
-                dir = "desc";
-                switching = true;
-              }
-            }
-          }
-        }
-    </script>
-</body>
-</html>
-    """
-    with open(history_file, "a") as f:
-        f.write(footer)
-
-# Save the downloaded URL and metadata to the PodcastHistory file
-def save_downloaded_url(history_file, metadata, transcript_name):
-    """Save the downloaded URL and metadata to the PodcastHistory file."""
-    print(f"Saving to HTML: {metadata['episode_title']}")
-
-    # Construct the transcript URL on GitHub
-    transcript_github_url = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO_NAME}/main/transcribed/{normalize_folder_name(metadata['podcast_name'])}/{transcript_name}"
-    
-    # Add transcript_url to metadata
-    metadata['transcript_url'] = transcript_github_url
-
-    # Handle case where link might be None or empty
-    pod_site_link = f"<a href=\"{html.escape(metadata.get('link', ''))}\" target=\"_blank\">Pod Site</a>" if metadata.get('link') else "N/A"
-    
-    entry = f"""
-<tr class="hover:bg-gray-100">
-    <td class="py-4 px-6 border-b text-lg"><a href="{html.escape(metadata['link'])}" target="_blank" class="text-blue-600 hover:underline">{html.escape(metadata['podcast_name'])}</a></td>
-    <td class="py-4 px-6 border-b text-lg"><a href="{html.escape(metadata['guid'])}" target="_blank" class="text-blue-600 hover:underline">{html.escape(metadata['episode_title'])}</a></td>
-    <td class="py-4 px-6 border-b text-lg">{html.escape(format_date_short(metadata['listenDate']))}</td>
-    <td class="py-4 px-6 border-b text-lg"><a href="{transcript_github_url}" target="_blank" class="text-blue-500 text-lg">&#x1F4C4;</a></td>
-    <td class="py-4 px-6 border-b text-lg"><audio src="{metadata['mp3_url']}" controls class="w-8 h-8"></audio></td>
-</tr>
-    """
-    with open(history_file, "a") as f:
-        f.write(entry)
-
 # Update the HTML file links to point to the appropriate locations, if necessary
 def update_html_links(history_file):
     """Update HTML file links to point to the appropriate locations, if necessary."""
@@ -1247,66 +3177,140 @@ def check_whisper_installed():
         print("Whisper is not fully installed.")
         return False
 
+# Open the ChromaDB client and collections, importing chromadb only when a run has work to do
+def init_chromadb(db_path=CHROMADB_DB_PATH):
+    """Import chromadb, open the persistent client and set the podcast and passage collection globals."""
+    global client, podcast_collection, passage_collection
+    # chromadb takes over a second to import, which a run that finds nothing new never pays
+    import chromadb
+    client = chromadb.PersistentClient(path=db_path)
+    podcast_collection = client.get_or_create_collection(name="podcasts")
+    passage_collection = client.get_or_create_collection(name=PASSAGE_COLLECTION_NAME)
+    client.heartbeat()
+    return client
+
 # Main script execution
 if __name__ == "__main__":
     print("Starting podcast transcription process...")
+
+    # Write the timings of this run to a report however the script exits
+    atexit.register(write_run_report)
     
     check_git_installed()
     print("Git check completed.")
 
+    # The SSH, repository, GitHub Pages and feed checks do not depend on each other, so they run at once
+    with span("startup_checks"):
+        run_startup_checks()
+
     if ENABLE_GITHUB_COMMIT and GITHUB_USERNAME != "your_github_username":
-        if check_github_ssh_connection():
+        if take_startup_result("ssh"):
             print("GitHub SSH connection successful.")
         else:
             print("GitHub SSH connection failed. Exiting.")
             exit(1)
 
     if GITHUB_REPO_CHECK:
-        check_create_github_repo(GITHUB_REPO_NAME)
+        check_create_github_repo(GITHUB_REPO_NAME, exists=take_startup_result("repo"))
         print("GitHub repository check completed.")
 
-    # Initialize the local Git repository
-    initialize_local_git_repo(REPO_ROOT)
-
-    # Ensure there's an initial commit
-    ensure_initial_commit(REPO_ROOT)
-
-    # Ensure APP_ENTRY and JINJA_TEMPLATES are copied to the Git repository
-    copy_files_to_repo_root()
+    # Skip all processing, hashing and git work when the feed has not changed since the last run
+    feed_chunks, feed_state = None, None
+    if not USE_EXISTING_DATA:
+        with span("feed_check"):
+            feed_changed, feed_chunks, feed_state = check_feed_for_changes(RSS_FEED_URL, prefetched=take_startup_result("feed"))
+        if not feed_changed:
+            if not has_unfinished_jobs():
+                print("No new podcasts found, skipping processing, hashing and git sync.")
+                print("Script completed successfully.")
+                exit(0)
+            # The feed has nothing new, but episodes an earlier run did not finish are resumed
+            print("Resuming episodes left unfinished by an earlier run.")
+            feed_chunks = iter(())
+
+    with span("git_setup"):
+        # Initialize the local Git repository
+        initialize_local_git_repo(REPO_ROOT)
+
+        # Ensure there's an initial commit
+        ensure_initial_commit(REPO_ROOT)
+
+        # Ensure APP_ENTRY and JINJA_TEMPLATES are copied to the Git repository
+        copy_files_to_repo_root()
     
+    # Stop the whisper server, if one gets started, when the script exits
+    if WHISPER_SERVER_ENABLED:
+        atexit.register(stop_whisper_server)
+
     # Initialize ChromaDB after Git repository is synchronized
-    global client, podcast_collection
-    client = chromadb.PersistentClient(path=CHROMADB_DB_PATH)
-    podcast_collection = client.get_or_create_collection(name="podcasts")
-    client.heartbeat()
+    with span("chromadb_init"):
+        init_chromadb()
 
     # Generate and compare hashes before syncing
     hash_file = os.path.join(REPO_ROOT, 'chroma_hashes.txt')
-    generate_chroma_hashes(CHROMADB_DB_PATH, REPO_ROOT, hash_file)
+    if SYNC_MODE == "deltas":
+        # The database is not in git; apply the delta files other machines pushed instead
+        with span("sync_import"):
+            pull_and_import_sync_deltas()
+    else:
+        with span("hash") as record:
+            record["bytes"] = generate_chroma_hashes(CHROMADB_DB_PATH, REPO_ROOT, hash_file)
 
-    pull_and_sync_chromadb_if_necessary(GITHUB_REPO_NAME, CHROMADB_DB_PATH, hash_file, os.path.relpath(CHROMADB_DB_PATH, REPO_ROOT))
+        with span("sync_pull"):
+            pull_and_sync_chromadb_if_necessary(GITHUB_REPO_NAME, CHROMADB_DB_PATH, hash_file, os.path.relpath(CHROMADB_DB_PATH, REPO_ROOT))
 
     try:
-        new_files = process_feed(RSS_FEED_URL, PODCAST_AUDIO_FOLDER, PODCAST_HISTORY_FILE, debug=True)
+        new_files = process_feed(RSS_FEED_URL, PODCAST_AUDIO_FOLDER, PODCAST_HISTORY_FILE, debug=True, feed_chunks=feed_chunks)
         print("RSS feed processing completed.")
+
+        # Make sure episodes indexed before passages existed are searchable too
+        with span("backfill_passages"):
+            index_missing_passages()
+
+        # Keep the keyword search index in step with the transcripts
+        with span("search_index"):
+            search_conn = open_search_index()
+            try:
+                update_search_index(search_conn)
+            finally:
+                search_conn.close()
+
+        # Only remember the feed once every new episode made it through, so failures are retried next run
+        if feed_state is not None:
+            if failed_episodes:
+                print(f"{len(failed_episodes)} episodes failed; the feed will be checked again on the next run.")
+            else:
+                save_feed_state(RSS_FEED_URL, feed_state)
         
         # Debugging statement to print whether new_files is empty or not
         # print(f"New files to be deleted: {new_files}")
 
-        # Regenerate the chroma hashes after updating the database
-        generate_chroma_hashes(CHROMADB_DB_PATH, REPO_ROOT, hash_file)
+        if SYNC_MODE == "deltas":
+            # Write only the episodes added by this run; the database folder itself is not committed
+            with span("sync_export"):
+                export_sync_delta(podcast_collection, passage_collection)
+        else:
+            # Regenerate the chroma hashes after updating the database
+            with span("hash") as record:
+                record["bytes"] = generate_chroma_hashes(CHROMADB_DB_PATH, REPO_ROOT, hash_file)
 
         if ENABLE_GITHUB_COMMIT:
-            upload_successful = commit_database_and_files(REPO_ROOT, CHROMADB_DB_PATH, PODCAST_HISTORY_FILE, new_files)
+            committed_db_path = None if SYNC_MODE == "deltas" else CHROMADB_DB_PATH
+            with span("git_commit"):
+                upload_successful = commit_database_and_files(REPO_ROOT, committed_db_path, PODCAST_HISTORY_FILE, new_files)
             if upload_successful:
                 print("Files successfully uploaded to GitHub.")
+                mark_jobs_committed()
             else:
                 print("No changes to upload to GitHub.")
+        else:
+            # Without git, indexing is the last stage an episode goes through
+            mark_jobs_committed()
    
     finally:
         print(f"Attempting to delete {len(new_files)} files")
-        # Always attempt to delete MP3 and WAV files after processing
-        for mp3_file, wav_file in new_files:
+        # Always attempt to delete MP3 files after processing
+        for mp3_file in new_files:
             if os.path.exists(mp3_file):
                 try:
                     os.remove(mp3_file)
@@ -1316,27 +3320,12 @@ if __name__ == "__main__":
             else:
                 print(f"MP3 file not found: {mp3_file}")
 
-            if os.path.exists(wav_file):
-                try:
-                    os.remove(wav_file)
-                    print(f"Deleted WAV file: {wav_file}")
-                except Exception as e:
-                    print(f"Failed to delete WAV file: {wav_file}. Error: {e}")
-            else:
-                print(f"WAV file not found: {wav_file}")
-
-    try:
-        subprocess.run(["git", "fetch", "origin"], cwd=REPO_ROOT, check=True)
-        # Check if origin/main exists before resetting
-        result = subprocess.run(["git", "rev-parse", "--verify", "origin/main"], cwd=REPO_ROOT, capture_output=True, text=True)
-        if result.returncode == 0:
-            subprocess.run(["git", "reset", "--hard", "origin/main"], cwd=REPO_ROOT, check=True)
-        else:
-            print("origin/main does not exist. Skipping git reset.")
-    except subprocess.CalledProcessError as e:
-        print(f"Git command failed: {e}")
+    with span("git_reset"):
+        reset_to_remote(REPO_ROOT)
 
     if ENABLE_GITHUB_PAGES:
-        enable_github_pages()
+        with span("github_pages"):
+            enable_github_pages()
 
+    print(f"Git subprocesses this run: {git_subprocess_count}")
     print("Script completed successfully.")
@@ -0,0 +1,90 @@
+// Loads the data file of one archive page, then sorts, filters and renders its rows in batches.
+// Rows are built like episode_row in _macros.html.
+(function () {
+  var BATCH_SIZE = 100;
+  var FIELDS = {{ fields|tojson }};
+  var table = document.getElementById("podcastTable");
+  var tbody = table.tBodies[0];
+  var filterInput = document.getElementById("archiveFilter");
+  var status = document.getElementById("archiveStatus");
+  var more = document.getElementById("archiveMore");
+  var transcriptBase = table.getAttribute("data-transcript-base");
+  var records = [], view = [], rendered = 0, sortField = "date", sortDirection = -1;
+
+  function escapeHtml(value) {
+    return String(value).replace(/[&<>"']/g, function (c) {
+      return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+    });
+  }
+
+  function rowHtml(r) {
+    var date = r.date ? r.date.slice(5, 7) + "/" + r.date.slice(8, 10) + "/" + r.date.slice(0, 4) : "";
+    return '<tr class="hover:bg-gray-100">' +
+      '<td class="py-4 px-6 border-b text-lg"><a href="' + escapeHtml(r.link) + '" target="_blank" class="text-blue-600 hover:underline">' + escapeHtml(r.podcast) + '</a></td>' +
+      '<td class="py-4 px-6 border-b text-lg"><a href="' + escapeHtml(r.guid) + '" target="_blank" class="text-blue-600 hover:underline">' + escapeHtml(r.episode) + '</a></td>' +
+      '<td class="py-4 px-6 border-b text-lg" data-sort="' + escapeHtml(r.date) + '">' + date + '</td>' +
+      '<td class="py-4 px-6 border-b text-lg"><a href="' + escapeHtml(transcriptBase + r.transcript) + '" target="_blank" class="text-blue-500 text-lg">&#x1F4C4;</a></td>' +
+      '<td class="py-4 px-6 border-b text-lg"><audio src="' + escapeHtml(r.mp3) + '" preload="none" controls class="w-8 h-8"></audio></td>' +
+      '</tr>';
+  }
+
+  // Only BATCH_SIZE rows are added to the page at a time, however large the shard is
+  function renderMore() {
+    var end = Math.min(rendered + BATCH_SIZE, view.length);
+    var html = [];
+    for (var i = rendered; i < end; i++) html.push(rowHtml(view[i]));
+    tbody.insertAdjacentHTML("beforeend", html.join(""));
+    rendered = end;
+    status.textContent = "Showing " + rendered + " of " + view.length + " episodes";
+    more.textContent = rendered < view.length ? "Scroll for more" : "";
+  }
+
+  function compare(a, b) {
+    var x = a.keys[sortField], y = b.keys[sortField];
+    return x < y ? -sortDirection : x > y ? sortDirection : 0;
+  }
+
+  // Filter and sort the records (Array.prototype.sort is O(n log n)), then render the first batch
+  function refresh() {
+    var query = filterInput.value.trim().toLowerCase();
+    view = query ? records.filter(function (r) { return r.text.indexOf(query) !== -1; }) : records.slice();
+    view.sort(compare);
+    tbody.innerHTML = "";
+    rendered = 0;
+    renderMore();
+  }
+
+  Array.prototype.forEach.call(table.tHead.querySelectorAll("th[data-field]"), function (th) {
+    th.addEventListener("click", function () {
+      var field = th.getAttribute("data-field");
+      sortDirection = field === sortField ? -sortDirection : 1;
+      sortField = field;
+      if (records.length) refresh();
+    });
+  });
+
+  var filterTimer = null;
+  filterInput.addEventListener("input", function () {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(function () { if (records.length) refresh(); }, 150);
+  });
+
+  if ("IntersectionObserver" in window) {
+    new IntersectionObserver(function (entries) {
+      if (entries[0].isIntersecting && rendered < view.length) renderMore();
+    }).observe(more);
+  } else {
+    more.addEventListener("click", renderMore);
+  }
+
+  fetch(table.getAttribute("data-shard")).then(function (response) { return response.json(); }).then(function (data) {
+    records = data.rows.map(function (row) {
+      var r = {};
+      FIELDS.forEach(function (field, i) { r[field] = row[i]; });
+      r.keys = {podcast: r.podcast.toLowerCase(), episode: r.episode.toLowerCase(), date: r.date};
+      r.text = r.keys.podcast + " " + r.keys.episode;
+      return r;
+    });
+    refresh();
+  });
+})();